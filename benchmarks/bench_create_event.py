@@ -0,0 +1,37 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tirreno_tracker import Tracker  # noqa: E402
+
+
+def bench(pending: int, samples: int) -> float:
+    tracker = Tracker(api_url="https://localhost/", api_key="k", event_timeout=3600)
+    for _ in range(pending):
+        tracker.create_event()
+
+    started = time.perf_counter()
+    for _ in range(samples):
+        tracker.create_event()
+    elapsed = time.perf_counter() - started
+
+    tracker.close()
+    return elapsed / samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tracker.create_event() cost against pending registry size")
+    parser.add_argument("--samples", type=int, default=10000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'pending':>10} {'us/create_event':>16}")
+    for size in args.sizes:
+        print(f"{size:>10} {bench(size, args.samples) * 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
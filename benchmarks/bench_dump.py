@@ -0,0 +1,91 @@
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tirreno_tracker import Event, Payload, dump_many  # noqa: E402
+
+
+def legacy_payload_dump(payload: Payload) -> dict:
+    out = {}
+    for prop in payload.PROPERTIES:
+        value = getattr(payload, prop, None)
+        if value is not None:
+            out[payload.PROPERTIES[prop]] = value
+    return out
+
+
+def legacy_dump(ev: Event) -> dict:
+    out = {}
+    missing = []
+
+    for prop in ev.DEFAULT_PROPERTIES:
+        value = getattr(ev, prop, None)
+        if value is None and prop in ev.LAZY_PROPERTIES:
+            value = getattr(ev, ev.LAZY_PROPERTIES[prop])()
+        if value is None:
+            missing.append(prop)
+        else:
+            out[ev.DEFAULT_PROPERTIES[prop]] = value
+
+    for prop in ev.OPTIONAL_PROPERTIES:
+        value = getattr(ev, prop, None)
+        if value is not None:
+            out[ev.OPTIONAL_PROPERTIES[prop]] = value
+
+    for prop in ev.OBJ_PROPERTIES:
+        value = getattr(ev, prop, None)
+        if value is not None:
+            if isinstance(value, list):
+                out[ev.OBJ_PROPERTIES[prop]] = [legacy_payload_dump(el) for el in value if isinstance(el, Payload)]
+            elif isinstance(value, Payload):
+                out[ev.OBJ_PROPERTIES[prop]] = legacy_payload_dump(value)
+
+    return out
+
+
+def make_event(i: int) -> Event:
+    return Event(i).set_user_name(f"user-{i}").set_ip_address("10.0.0.1").set_user_agent("Mozilla/5.0") \
+        .set_browser_language("en").set_http_method("GET").set_http_referer("https://ref/") \
+        .set_url("/page").set_payload(Payload().set_field_id("f").set_new_value("n"))
+
+
+def timed(fn, events, repeat: int = 3) -> float:
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn(events)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+
+    return best / len(events)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Event.dump() throughput")
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    events = [make_event(i) for i in range(args.count)]
+    assert [legacy_dump(ev) for ev in events[:100]] == dump_many(events[:100])
+
+    results = [
+        ("legacy getattr loop", timed(lambda evs: [legacy_dump(ev) for ev in evs], events)),
+        ("Event.dump()", timed(lambda evs: [ev.dump() for ev in evs], events)),
+        ("dump_many()", timed(dump_many, events)),
+    ]
+
+    print(f"{'path':<22} {'us/event':>10}")
+    for name, elapsed in results:
+        print(f"{name:<22} {elapsed * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
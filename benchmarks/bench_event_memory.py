@@ -0,0 +1,49 @@
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tirreno_tracker import Event  # noqa: E402
+
+
+def without_slots(cls: type) -> type:
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name not in ("__slots__", "__dict__", "__weakref__") and name not in cls.__slots__
+    }
+    return type(f"Dict{cls.__name__}", cls.__bases__, namespace)
+
+
+def fill(ev: Event, i: int) -> Event:
+    return ev.set_user_name(f"user-{i}").set_ip_address("10.0.0.1").set_user_agent("Mozilla/5.0") \
+        .set_browser_language("en").set_http_method("GET").set_http_referer("https://ref/") \
+        .set_url("/page")
+
+
+def bytes_per_event(cls: type, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    events = [fill(cls(i), i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del events
+    return (after - before) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory held per Event instance, with and without __slots__")
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+
+    legacy = bytes_per_event(without_slots(Event), args.count)
+    slotted = bytes_per_event(Event, args.count)
+
+    print(f"{'events':>10} {'__dict__ B/event':>18} {'__slots__ B/event':>18}")
+    print(f"{args.count:>10} {legacy:>18.1f} {slotted:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
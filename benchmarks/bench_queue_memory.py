@@ -0,0 +1,53 @@
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tirreno_tracker.buffer import STORAGE_COLUMNAR, STORAGE_DICT, create_lane  # noqa: E402
+
+
+def event(i: int) -> dict:
+    # strings parsed from requests are fresh objects even when their values repeat
+    return {
+        "userName": f"user-{i % 5000}",
+        "ipAddress": f"10.0.{i % 7}.1",
+        "url": "/page/" + str(i % 50),
+        "userAgent": "".join(["Mozilla/5.0 (X11; Linux x86_64) ", "Firefox/128.0"]),
+        "browserLanguage": "".join(["en-", "US"]),
+        "httpMethod": "".join(["GE", "T"]),
+        "httpReferer": "".join(["https://", "example.com/"]),
+        "eventTime": f"2024-01-01 {i // 3600000 % 24:02d}:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:03d}",
+        "eventType": "".join(["page_", "view"]),
+        "httpCode": 200,
+    }
+
+
+def bytes_per_event(storage: str, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    lane = create_lane(storage)
+    for i in range(count):
+        lane.append(event(i))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del lane
+    return (after - before) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory held per queued event, dict and columnar queue storage")
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    plain = bytes_per_event(STORAGE_DICT, args.count)
+    columnar = bytes_per_event(STORAGE_COLUMNAR, args.count)
+
+    print(f"{'events':>10} {'dict B/event':>14} {'columnar B/event':>18}")
+    print(f"{args.count:>10} {plain:>14.1f} {columnar:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,12 +29,16 @@ setup(
     python_requires=">=3.6",
     install_requires=[
         "requests>=2",
+        "urllib3>=1.21.1",
         "typing_extensions<4.2; python_version == \"3.6\"",
         "typing_extensions<4.8; python_version == \"3.7\"",
         "typing_extensions<4.14; python_version == \"3.8\"",
         "importlib_metadata<=4.5; python_version == \"3.6\"",
         "importlib_metadata<=7.0; python_version < \"3.8\"",
     ],
+    extras_require={
+        "async": ["aiohttp>=3"],
+    },
     classifiers=[
         "Environment :: Web Environment",
         "Intended Audience :: Developers",
@@ -1,6 +1,13 @@
-from .tracking import Tracker, Event, Payload
+from .tracking import Tracker, Event, Payload, dump_many
+from .asyncio_tracking import AsyncTracker
+from .coalescing import Coalescer
+from .resilience import CircuitBreaker, RetryPolicy
+from .sampling import EventPolicy
+from .sender import DEFAULT_PRIORITIES, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+from .spool import DiskSpool
 
-__all__ = ["Tracker", "Event", "Payload"]
+__all__ = ["Tracker", "AsyncTracker", "Event", "Payload", "DiskSpool", "RetryPolicy", "CircuitBreaker", "EventPolicy", "Coalescer",
+           "DEFAULT_PRIORITIES", "PRIORITY_HIGH", "PRIORITY_NORMAL", "PRIORITY_LOW", "dump_many"]
 
 __version_info__ = (0, 1, "0b4")
 __version__ = ".".join(str(x) for x in __version_info__)
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+from typing import Any, List, Optional
+
+from .diagnostics import diagnostics
+
+
+# events are sent as single datagrams, larger ones fail on the client and are spooled
+MAX_DATAGRAM = 128 << 10
+
+
+class AggregatorClient:
+    def __init__(self, path: str) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Aggregator requires Unix domain sockets")
+
+        self.path = path
+        self._socket = None
+        self._pid = None
+
+    def _get_socket(self) -> socket.socket:
+        if self._socket is None or self._pid != os.getpid():
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+            self._pid = os.getpid()
+
+        return self._socket
+
+    def send_many(self, batch: List[dict]) -> List[bool]:
+        sock = self._get_socket()
+        results = []
+
+        for data in batch:
+            body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            if len(body) > MAX_DATAGRAM:
+                diagnostics.report(
+                    "aggregator error",
+                    "Event of %d bytes exceeds the aggregator datagram limit",
+                    len(body),
+                    summary="too large for the aggregator",
+                )
+                results.append(False)
+                continue
+            try:
+                sock.sendto(body, self.path)
+                results.append(True)
+            except OSError as e:
+                diagnostics.report("aggregator error", "Sending event to aggregator failed: %s", e, summary="failed to reach aggregator")
+                results.append(False)
+
+        return results
+
+    def close(self) -> None:
+        if self._socket is not None and self._pid == os.getpid():
+            self._socket.close()
+        self._socket = None
+
+
+class Aggregator:
+    def __init__(self, path: str, tracker: Any, mode: int = 0o600) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Aggregator requires Unix domain sockets")
+
+        self.path = path
+        self._tracker = tracker
+        self._closed = threading.Event()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(path)
+        os.chmod(path, mode)
+        self._socket.settimeout(0.5)
+
+        self._thread = threading.Thread(target=self._receive, name="tirreno-aggregator", daemon=True)
+        self._thread.start()
+
+    def _receive(self) -> None:
+        while not self._closed.is_set():
+            try:
+                body = self._socket.recv(MAX_DATAGRAM + 1)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(body) > MAX_DATAGRAM:
+                diagnostics.report("aggregator decode error", "Dropping oversized aggregator datagram", summary="oversized")
+                continue
+
+            try:
+                data = json.loads(body.decode("utf-8"))
+            except ValueError as e:
+                diagnostics.report("aggregator decode error", "Dropping malformed aggregator datagram: %s", e, summary="malformed")
+                continue
+
+            self._tracker._submit(data)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._closed.set()
+        self._thread.join(timeout)
+        self._socket.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .tracking import Tracker
+
+    parser = argparse.ArgumentParser(description="Forward events from local processes to tirreno")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--key", default=os.getenv("TIRRENO_API_KEY", ""))
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    tracker = Tracker(
+        args.url,
+        args.key,
+        async_mode=True,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+    )
+    aggregator = Aggregator(args.socket, tracker)
+
+    stopped = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopped.set())
+    while not stopped.wait(1.0):
+        pass
+
+    aggregator.close()
+    tracker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Any, Dict, Optional, Union
+
+from .diagnostics import diagnostics
+from .encoding import Encoder, get_encoder
+from .registry import EVICT_OLDEST
+from .sampling import EventPolicy
+from .tracking import BaseTracker, Event
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+SEND_ERRORS = (asyncio.TimeoutError, OSError) + ((aiohttp.ClientError,) if aiohttp is not None else ())
+
+
+class AsyncTracker(BaseTracker):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        event_timeout: int = 30,
+        connection_timeout: int = 3,
+        max_in_flight: int = 10,
+        pool_maxsize: int = 10,
+        session: Any = None,
+        max_pending_events: Optional[int] = None,
+        max_pending_bytes: Optional[int] = None,
+        eviction_policy: str = EVICT_OLDEST,
+        registry_shards: int = 16,
+        policies: Optional[Dict[str, EventPolicy]] = None,
+        encoder: Union[str, Encoder, None] = None,
+    ) -> None:
+        if session is None and aiohttp is None:
+            raise ImportError("AsyncTracker requires aiohttp, install it with `pip install tirreno_tracker[async]`")
+
+        super().__init__(
+            api_url,
+            api_key,
+            event_timeout=event_timeout,
+            connection_timeout=connection_timeout,
+            max_pending_events=max_pending_events,
+            max_pending_bytes=max_pending_bytes,
+            eviction_policy=eviction_policy,
+            registry_shards=registry_shards,
+            policies=policies,
+        )
+        if len(self._urls) > 1:
+            raise ValueError("AsyncTracker supports a single api_url")
+        self._encoder = get_encoder(encoder)
+        self._headers.update(self._encoder.headers())
+        self._session = session
+        self._own_session = session is None
+        self._pool_maxsize = pool_maxsize
+        self._max_in_flight = max_in_flight
+        self._semaphore = None
+        self._tasks = set()
+
+    async def __aenter__(self) -> "AsyncTracker":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    def _get_session(self) -> Any:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_maxsize),
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+
+        return self._session
+
+    async def track(self, event: Event) -> "AsyncTracker":
+        data = self._collect(event)
+        if data is not None:
+            await self._send(data)
+
+        return self
+
+    def track_nowait(self, event: Event) -> Optional[asyncio.Future]:
+        data = self._collect(event)
+        if data is None:
+            return None
+
+        return self._schedule(data)
+
+    def _track_scoped(self, event: Event) -> None:
+        data = self._prepare(event)
+        if data is not None:
+            self._schedule(data)
+
+    def _schedule(self, data: dict) -> asyncio.Future:
+        task = asyncio.ensure_future(self._send(data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return task
+
+    async def _send(self, data: dict) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_in_flight)
+
+        # batching encoders get a batch of one, so the body has the same shape as from Tracker
+        body = self._encoder.encode_batch([data]) if self._encoder.batching else self._encoder.encode(data)
+        async with self._semaphore:
+            try:
+                async with self._get_session().post(self._url, data=body, headers=self._headers) as response:
+                    await response.read()
+            except SEND_ERRORS as e:
+                diagnostics.report("request error", "Sending event failed: %s", e, summary="failed to send")
+
+    async def aclose(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,157 @@
+from array import array
+from collections import deque
+from typing import Any, Callable, Iterator, List, Optional
+
+STORAGE_DICT = "dict"
+STORAGE_COLUMNAR = "columnar"
+
+STORAGES = (STORAGE_DICT, STORAGE_COLUMNAR)
+
+HOT_ROWS = 256
+# values are dictionary encoded per chunk with 16 bit codes, the dictionaries go with the chunk
+CHUNK_ROWS = 1024
+UNIQUE_ROWS = 64
+
+
+class _Column:
+    __slots__ = ("codes", "values", "index")
+
+    def __init__(self, rows: int) -> None:
+        self.codes = array("H", bytes(2 * rows))
+        self.values = []
+        self.index = {}
+
+    def append(self, row: int, value: Any) -> None:
+        if len(self.codes) < row:
+            self.codes.frombytes(bytes(2 * (row - len(self.codes))))
+
+        index = self.index
+        key = code = None
+        if index is not None:
+            # 1 == True, so only strings are looked up by value alone
+            key = value if value.__class__ is str else (value.__class__, value)
+            try:
+                code = index.get(key)
+            except TypeError:
+                key = None
+
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            if key is not None:
+                index[key] = code
+                # mostly unique values such as event times are cheaper without the index
+                if code >= UNIQUE_ROWS and 4 * code > 3 * len(self.codes):
+                    self.index = None
+        self.codes.append(code)
+
+
+class _Chunk:
+    __slots__ = ("shapes", "columns", "head")
+
+    def __init__(self) -> None:
+        self.shapes = []
+        self.columns = {}
+        self.head = 0
+
+    def append(self, data: dict, shape: tuple) -> None:
+        row = len(self.shapes)
+        self.shapes.append(shape)
+
+        columns = self.columns
+        for key, value in data.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = _Column(row)
+            column.append(row, value)
+
+    def row(self, row: int) -> dict:
+        columns = self.columns
+        out = {}
+        for key in self.shapes[row]:
+            column = columns[key]
+            out[key] = column.values[column.codes[row]]
+
+        return out
+
+    def pop(self) -> dict:
+        data = self.row(self.head)
+        self.head += 1
+
+        return data
+
+
+class ColumnarLane:
+    def __init__(
+        self,
+        hot_rows: int = HOT_ROWS,
+        chunk_rows: int = CHUNK_ROWS,
+        on_compact: Optional[Callable[[List[dict]], None]] = None,
+    ) -> None:
+        if not 0 < chunk_rows <= 1 << 16 or hot_rows < 1:
+            raise ValueError("hot_rows should be positive and chunk_rows between 1 and 65536")
+
+        self._hot_rows = hot_rows
+        self._chunk_rows = chunk_rows
+        self._on_compact = on_compact
+        self._hot = deque()
+        self._chunks = deque()
+        self._shapes = {}
+        self._cold = 0
+
+    def __len__(self) -> int:
+        return self._cold + len(self._hot)
+
+    def __iter__(self) -> Iterator[dict]:
+        for chunk in self._chunks:
+            for row in range(chunk.head, len(chunk.shapes)):
+                yield chunk.row(row)
+        yield from self._hot
+
+    def append(self, data: dict) -> None:
+        self._hot.append(data)
+        if len(self._hot) >= 2 * self._hot_rows:
+            self._compact(self._hot_rows)
+
+    def _compact(self, count: int) -> None:
+        # recent events stay dicts, so they can still be updated in place while queued
+        items = [self._hot.popleft() for _ in range(count)]
+        if self._on_compact is not None:
+            self._on_compact(items)
+
+        chunks = self._chunks
+        shapes = self._shapes
+        chunk = chunks[-1] if chunks else None
+        for data in items:
+            if chunk is None or len(chunk.shapes) >= self._chunk_rows:
+                chunk = _Chunk()
+                chunks.append(chunk)
+            keys = tuple(data)
+            chunk.append(data, shapes.setdefault(keys, keys))
+
+        self._cold += count
+
+    def popleft(self) -> dict:
+        if not self._cold:
+            return self._hot.popleft()
+
+        chunk = self._chunks[0]
+        data = chunk.pop()
+        self._cold -= 1
+        if chunk.head == len(chunk.shapes):
+            self._chunks.popleft()
+
+        return data
+
+    def clear(self) -> None:
+        self._hot.clear()
+        self._chunks.clear()
+        self._shapes.clear()
+        self._cold = 0
+
+
+def create_lane(storage: str, on_compact: Optional[Callable[[List[dict]], None]] = None) -> object:
+    if storage == STORAGE_COLUMNAR:
+        return ColumnarLane(HOT_ROWS, CHUNK_ROWS, on_compact)
+
+    return deque()
@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from .sampling import EXEMPT_TYPES
+
+COALESCE_FIELDS = ("eventType", "userName", "ipAddress", "url", "userAgent")
+
+REPEAT_COUNT = "repeatCount"
+
+
+class Coalescer:
+    def __init__(
+        self,
+        fields: Sequence[str] = COALESCE_FIELDS,
+        window: float = 1.0,
+        slots: int = 4096,
+        exempt: Iterable[str] = EXEMPT_TYPES,
+    ) -> None:
+        if not fields:
+            raise ValueError("fields should not be empty")
+        if window <= 0 or slots < 1:
+            raise ValueError("window and slots should be positive")
+
+        self.fields = tuple(fields)
+        self.window = window
+        # every failed login counts, security events are never collapsed
+        self.exempt = frozenset(exempt)
+        self._mask = (1 << (slots - 1).bit_length()) - 1
+        self._slots = [None] * (self._mask + 1)
+        self._attrs = None
+        self._lazy = None
+        self._lock = threading.Lock()
+
+    def fork(self) -> "Coalescer":
+        coalescer = Coalescer(self.fields, self.window, len(self._slots), self.exempt)
+        coalescer._attrs = self._attrs
+        coalescer._lazy = self._lazy
+
+        return coalescer
+
+    def bind(self, properties: Dict[str, str], lazy: Optional[Dict[str, str]] = None) -> None:
+        attrs = {key: prop for prop, key in properties.items()}
+        unknown = [field for field in self.fields if field not in attrs]
+        if unknown:
+            raise ValueError(f"Unknown coalesce fields {', '.join(unknown)}")
+
+        self._attrs = tuple(attrs[field] for field in self.fields)
+        # lazily formatted properties are still None on the event, key them as they are dumped
+        lazy = {attr: method for attr, method in (lazy or {}).items() if attr in self._attrs}
+        self._lazy = tuple((attr, lazy.get(attr)) for attr in self._attrs) if lazy else None
+
+    def key(self, event: object) -> Tuple:
+        if self._lazy is None:
+            return tuple([getattr(event, attr) for attr in self._attrs])
+
+        out = []
+        for attr, method in self._lazy:
+            value = getattr(event, attr)
+            if value is None and method is not None:
+                value = getattr(event, method)()
+            out.append(value)
+
+        return tuple(out)
+
+    def merge(self, key: Tuple) -> bool:
+        now = time.monotonic()
+        index = hash(key) & self._mask
+
+        with self._lock:
+            entry = self._slots[index]
+            if entry is None or entry[0] != key or now - entry[1] > self.window:
+                return False
+
+            entry[1] = now
+            data = entry[2]
+            data[REPEAT_COUNT] = data.get(REPEAT_COUNT, 1) + 1
+
+        return True
+
+    def remember(self, key: Tuple, data: dict) -> None:
+        # a colliding key simply evicts the older entry
+        with self._lock:
+            self._slots[hash(key) & self._mask] = [key, time.monotonic(), data]
+
+    def seal(self, batch: Iterable[dict]) -> None:
+        slots = self._slots
+        fields = self.fields
+
+        with self._lock:
+            for data in batch:
+                index = hash(tuple([data.get(field) for field in fields])) & self._mask
+                entry = slots[index]
+                if entry is not None and entry[2] is data:
+                    slots[index] = None
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._slots)
@@ -0,0 +1,40 @@
+import threading
+from typing import Any
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
+
+
+class ThreadLocalVar:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+            return stack
+
+    def get(self, default: Any = None) -> Any:
+        stack = self._stack()
+        return stack[-1] if stack else default
+
+    def set(self, value: Any) -> int:
+        stack = self._stack()
+        stack.append(value)
+        return len(stack) - 1
+
+    def reset(self, token: int) -> None:
+        del self._stack()[token:]
+
+
+def context_var(name: str) -> Any:
+    # Python 3.6 has no contextvars, scopes are per thread there and not per asyncio task
+    if ContextVar is None:
+        return ThreadLocalVar(name)
+
+    return ContextVar(name)
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+
+logger = logging.getLogger("tirreno_tracker")
+
+
+class Diagnostics:
+    def __init__(self, log: logging.Logger = logger, interval: float = 60.0) -> None:
+        self.logger = log
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def report(
+        self,
+        category: str,
+        message: str,
+        *args: object,
+        summary: Optional[str] = None,
+        level: int = logging.WARNING,
+        count: int = 1,
+    ) -> None:
+        now = time.monotonic()
+        window = self._windows.get(category)
+
+        if window is not None and now - window[0] < self.interval:
+            with self._lock:
+                window[1] += count
+            return
+
+        with self._lock:
+            window = self._windows.get(category)
+            if window is not None and now - window[0] < self.interval:
+                window[1] += count
+                return
+            self._windows[category] = [now, 0, summary or category, level]
+
+        if window is not None and window[1]:
+            self._log_suppressed(window)
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args)
+
+    def debug_enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def _log_suppressed(self, window: list) -> None:
+        started, count, summary, level = window
+        self.logger.log(level, "%s events %s in last %ds", f"{count:,}", summary, round(time.monotonic() - started))
+
+    def flush(self) -> None:
+        windows = []
+        with self._lock:
+            for category, window in list(self._windows.items()):
+                if window[1]:
+                    windows.append(window)
+                    del self._windows[category]
+
+        for window in windows:
+            self._log_suppressed(window)
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._windows = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._windows = {}
+
+
+diagnostics = Diagnostics()
@@ -0,0 +1,83 @@
+import gzip
+import json
+from typing import List, Optional, Union
+from urllib.parse import urlencode
+
+
+class Encoder:
+    content_type = "application/octet-stream"
+    content_encoding = None
+    batching = False
+
+    def encode(self, data: dict) -> bytes:
+        raise NotImplementedError
+
+    def encode_batch(self, batch: List[dict]) -> bytes:
+        raise NotImplementedError
+
+    def headers(self) -> dict:
+        headers = {"Content-Type": self.content_type}
+        if self.content_encoding is not None:
+            headers["Content-Encoding"] = self.content_encoding
+
+        return headers
+
+
+class FormEncoder(Encoder):
+    content_type = "application/x-www-form-urlencoded"
+
+    def encode(self, data: dict) -> bytes:
+        pairs = []
+        for key, values in data.items():
+            if isinstance(values, (str, bytes)) or not hasattr(values, "__iter__"):
+                values = (values,)
+            for value in values:
+                if value is not None:
+                    pairs.append((key, value))
+
+        return urlencode(pairs, doseq=True).encode("ascii")
+
+
+class JsonEncoder(Encoder):
+    content_type = "application/json"
+
+    def __init__(self, batch: bool = False) -> None:
+        self.batching = batch
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def encode_batch(self, batch: List[dict]) -> bytes:
+        return json.dumps(batch, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class GzipEncoder(JsonEncoder):
+    content_encoding = "gzip"
+
+    def __init__(self, batch: bool = True, level: int = 6) -> None:
+        super().__init__(batch=batch)
+        self._level = level
+
+    def encode(self, data: dict) -> bytes:
+        return gzip.compress(super().encode(data), self._level)
+
+    def encode_batch(self, batch: List[dict]) -> bytes:
+        return gzip.compress(super().encode_batch(batch), self._level)
+
+
+ENCODERS = {
+    "form": FormEncoder,
+    "json": JsonEncoder,
+    "gzip": GzipEncoder,
+}
+
+
+def get_encoder(encoder: Optional[Union[str, Encoder]]) -> Encoder:
+    if encoder is None:
+        return FormEncoder()
+    if isinstance(encoder, Encoder):
+        return encoder
+    if encoder not in ENCODERS:
+        raise ValueError(f"Unknown encoder {encoder}, expected one of {', '.join(ENCODERS)}")
+
+    return ENCODERS[encoder]()
@@ -0,0 +1,21 @@
+import os
+from itertools import count
+from typing import Any
+from uuid import UUID
+
+COUNTER_MASK = (1 << 62) - 1
+
+
+class EventIds:
+    def __init__(self) -> None:
+        # random high half with the version 4 nibble, a counter in the low half after the variant bits
+        high = int.from_bytes(os.urandom(8), "big") & ~0xF000 | 0x4000
+        self._base = high << 64 | 1 << 63
+        self._count = count()
+
+    def next(self) -> int:
+        return self._base | next(self._count) & COUNTER_MASK
+
+
+def public_uuid(key: Any) -> Any:
+    return UUID(int=key) if key.__class__ is int else key
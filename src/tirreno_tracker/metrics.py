@@ -0,0 +1,154 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+COUNTERS = (
+    "events_created",
+    "events_tracked",
+    "events_dropped",
+    "events_expired",
+    "events_sampled_out",
+    "events_coalesced",
+    "events_abandoned",
+    "events_sent",
+    "events_failed",
+    "requests",
+    "retries",
+    "bytes_sent",
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DURATION_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.001, 0.01, 0.1)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+HISTOGRAMS = {
+    "send_latency_seconds": LATENCY_BUCKETS,
+    "dump_seconds": DURATION_BUCKETS,
+    "encode_seconds": DURATION_BUCKETS,
+    "batch_size": SIZE_BUCKETS,
+}
+
+RETIRE_SHARDS = 64
+
+MetricsHook = Callable[[str, str, float], None]
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Shard:
+    def __init__(self, thread: Optional[threading.Thread] = None) -> None:
+        self.thread = thread
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram(buckets) for name, buckets in HISTOGRAMS.items()}
+
+    def merge(self, other: "_Shard") -> None:
+        for name, value in other.counters.items():
+            self.counters[name] += value
+        for name, histogram in other.histograms.items():
+            merged = self.histograms[name]
+            merged.sum += histogram.sum
+            merged.count += histogram.count
+            for i, count in enumerate(histogram.counts):
+                merged.counts[i] += count
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard()
+        self._retire_at = RETIRE_SHARDS
+        self._hooks = []
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+                if len(self._shards) >= self._retire_at:
+                    self._retire()
+                    self._retire_at = max(RETIRE_SHARDS, 2 * len(self._shards))
+            return shard
+
+    def _retire(self) -> None:
+        # threads that exited write no more, fold their shards into one total
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+
+    def fork(self) -> "Metrics":
+        metrics = Metrics()
+        metrics._hooks = list(self._hooks)
+
+        return metrics
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        self._hooks.append(hook)
+
+    def inc(self, name: str, value: int = 1) -> None:
+        self._shard().counters[name] += value
+        if self._hooks:
+            for hook in self._hooks:
+                hook("counter", name, value)
+
+    def observe(self, name: str, value: float) -> None:
+        self._shard().histograms[name].observe(value)
+        if self._hooks:
+            for hook in self._hooks:
+                hook("histogram", name, value)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            self._retire()
+            shards = list(self._shards)
+            shards.append(self._retired)
+
+        out = dict.fromkeys(COUNTERS, 0)
+        for shard in shards:
+            for name, value in shard.counters.items():
+                out[name] += value
+
+        for name, buckets in HISTOGRAMS.items():
+            counts = [0] * (len(buckets) + 1)
+            total = 0.0
+            for shard in shards:
+                histogram = shard.histograms[name]
+                total += histogram.sum
+                for i, count in enumerate(histogram.counts):
+                    counts[i] += count
+            out[name] = {
+                "buckets": dict(zip(buckets + (float("inf"),), _cumulative(counts))),
+                "sum": total,
+                "count": sum(counts),
+            }
+
+        return out
+
+
+def _cumulative(counts: List[int]) -> List[int]:
+    out = []
+    total = 0
+    for count in counts:
+        total += count
+        out.append(total)
+
+    return out
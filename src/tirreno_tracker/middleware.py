@@ -0,0 +1,218 @@
+import asyncio
+import ipaddress
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional
+from wsgiref.util import request_uri
+
+from .diagnostics import diagnostics
+
+ENVIRON_KEY = "tirreno.event"
+
+
+@lru_cache(maxsize=1024)
+def primary_language(header: str) -> Optional[str]:
+    best = None
+    best_q = 0.0
+
+    for part in header.split(","):
+        tag, _, params = part.strip().partition(";")
+        tag = tag.strip()
+        if not tag or tag == "*":
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if q > best_q:
+            best, best_q = tag, q
+
+    return best
+
+
+class ProxyResolver:
+    def __init__(self, trusted_proxies: Iterable[str] = ()) -> None:
+        self._networks = [ipaddress.ip_network(proxy, strict=False) for proxy in trusted_proxies]
+        self.is_trusted = lru_cache(maxsize=1024)(self._is_trusted)
+
+    def _is_trusted(self, ip: str) -> bool:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+
+        return any(address in network for network in self._networks)
+
+    def resolve(self, remote_addr: Optional[str], forwarded_for: Optional[str]) -> Optional[str]:
+        if not forwarded_for or not self._networks or not remote_addr or not self.is_trusted(remote_addr):
+            return remote_addr
+
+        # walk from the nearest hop, the first untrusted address is the client
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not self.is_trusted(hop):
+                return hop
+
+        return hops[0] if hops else remote_addr
+
+
+class _Middleware:
+    def __init__(
+        self,
+        app: Any,
+        tracker: Any,
+        trusted_proxies: Iterable[str] = (),
+        user_name: Optional[Callable[[dict], Optional[str]]] = None,
+    ) -> None:
+        self.app = app
+        self.tracker = tracker
+        self._proxies = ProxyResolver(trusted_proxies)
+        self._user_name = user_name
+
+    def _create_event(self, request: dict, headers: dict, remote_addr: Optional[str], method: str, url: str) -> Any:
+        event = self.tracker.create_event()
+        event.set_ip_address(self._proxies.resolve(remote_addr, headers.get("x-forwarded-for")))
+        event.set_http_method(method)
+        event.set_url(url)
+
+        user_agent = headers.get("user-agent")
+        if user_agent is not None:
+            event.set_user_agent(user_agent)
+        referer = headers.get("referer")
+        if referer is not None:
+            event.set_http_referer(referer)
+        language = headers.get("accept-language")
+        if language:
+            language = primary_language(language)
+            if language is not None:
+                event.set_browser_language(language)
+        if self._user_name is not None:
+            user_name = self._user_name(request)
+            if user_name is not None:
+                event.set_user_name(user_name)
+
+        request[ENVIRON_KEY] = event
+
+        return event
+
+
+class WSGIMiddleware(_Middleware):
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        headers = {
+            "x-forwarded-for": environ.get("HTTP_X_FORWARDED_FOR"),
+            "user-agent": environ.get("HTTP_USER_AGENT"),
+            "referer": environ.get("HTTP_REFERER"),
+            "accept-language": environ.get("HTTP_ACCEPT_LANGUAGE"),
+        }
+        event = self._create_event(
+            environ,
+            headers,
+            environ.get("REMOTE_ADDR"),
+            environ.get("REQUEST_METHOD", "GET"),
+            request_uri(environ),
+        )
+
+        def _start_response(status: str, response_headers: List, exc_info: Any = None) -> Callable:
+            event.set_http_code(int(status[:3]))
+            if exc_info is None:
+                return start_response(status, response_headers)
+            return start_response(status, response_headers, exc_info)
+
+        try:
+            result = self.app(environ, _start_response)
+        except Exception:
+            if event.get_http_code() is None:
+                event.set_http_code(500)
+            self._track(event)
+            raise
+
+        return _TrackingIterable(result, lambda: self._track(event))
+
+    def _track(self, event: Any) -> None:
+        try:
+            self.tracker.track(event)
+        except Exception as e:
+            diagnostics.report("middleware error", "Tracking request failed: %r", e, summary="failed to track in middleware")
+
+
+class _TrackingIterable:
+    def __init__(self, iterable: Iterable[bytes], callback: Callable[[], None]) -> None:
+        self._iterable = iterable
+        self._callback = callback
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self) -> None:
+        # servers call close() after the last byte of the response was written
+        try:
+            close = getattr(self._iterable, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._callback()
+
+
+class ASGIMiddleware(_Middleware):
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {}
+        for name, value in scope.get("headers") or ():
+            name = name.decode("latin-1").lower()
+            value = value.decode("latin-1")
+            headers[name] = headers[name] + ", " + value if name in headers else value
+
+        client = scope.get("client")
+        event = self._create_event(
+            scope,
+            headers,
+            client[0] if client else None,
+            scope.get("method", "GET"),
+            _scope_url(scope, headers),
+        )
+
+        async def _send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                event.set_http_code(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        except Exception:
+            if event.get_http_code() is None:
+                event.set_http_code(500)
+            await self._track(event)
+            raise
+
+        await self._track(event)
+
+    async def _track(self, event: Any) -> None:
+        try:
+            track_nowait = getattr(self.tracker, "track_nowait", None)
+            if track_nowait is not None:
+                track_nowait(event)
+            else:
+                await asyncio.get_event_loop().run_in_executor(None, self.tracker.track, event)
+        except Exception as e:
+            diagnostics.report("middleware error", "Tracking request failed: %r", e, summary="failed to track in middleware")
+
+
+def _scope_url(scope: dict, headers: dict) -> str:
+    scheme = scope.get("scheme", "http")
+    host = headers.get("host")
+    if host is None:
+        server = scope.get("server")
+        host = f"{server[0]}:{server[1]}" if server else "localhost"
+
+    url = f"{scheme}://{host}{scope.get('root_path', '')}{scope['path']}"
+    query = scope.get("query_string")
+    if query:
+        url += "?" + query.decode("latin-1")
+
+    return url
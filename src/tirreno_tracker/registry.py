@@ -0,0 +1,255 @@
+import sys
+import threading
+from collections import OrderedDict, deque
+from itertools import count
+from typing import Any, List, Optional, Tuple
+
+
+EVICT_OLDEST = "oldest"
+EVICT_LRU = "lru"
+
+EVICTION_POLICIES = (EVICT_OLDEST, EVICT_LRU)
+
+# events are mostly filled after they were added, each add measures this many earlier ones again
+MEASURE_PER_ADD = 2
+
+
+def approx_size(obj: Any) -> int:
+    size = sys.getsizeof(obj)
+    values = list(getattr(obj, "__dict__", {}).values())
+    for slot in getattr(type(obj), "__slots__", ()):
+        values.append(getattr(obj, slot, None))
+
+    for value in values:
+        if value is not None:
+            size += sys.getsizeof(value)
+
+    return size
+
+
+class EventRegistry:
+    def __init__(
+        self,
+        max_events: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = EVICT_OLDEST,
+        sequence: Optional[count] = None,
+        sized: Optional[bool] = None,
+    ) -> None:
+        if eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy {eviction_policy}, expected one of {', '.join(EVICTION_POLICIES)}")
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_events = max_events
+        self._max_bytes = max_bytes
+        self._lru = eviction_policy == EVICT_LRU
+        self._last_ts = None
+        self._bytes = 0
+        self._sequence = sequence if sequence is not None else count()
+        self._sized = sized if sized is not None else max_bytes is not None
+        self._unmeasured = deque()
+
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, uuid: Any) -> bool:
+        return uuid in self._entries
+
+    def __getitem__(self, uuid: Any) -> dict:
+        return self._entries[uuid]
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def add(self, uuid: Any, event: Any, ts: int) -> List[Tuple[Any, Any]]:
+        size = approx_size(event) if self._sized else 0
+
+        with self._lock:
+            if self._sized:
+                self._measure(ts)
+                self._unmeasured.append((uuid, ts))
+            self._entries[uuid] = {
+                "event": event,
+                "ts": ts,
+                "size": size,
+                "seq": next(self._sequence),
+            }
+            self._bytes += size
+            self._last_ts = ts
+
+            return self._evict()
+
+    def _measure(self, ts: int) -> None:
+        # only events added in an earlier second, the current ones are likely still being filled
+        unmeasured = self._unmeasured
+        for _ in range(MEASURE_PER_ADD):
+            if not unmeasured or unmeasured[0][1] >= ts:
+                break
+            entry = self._entries.get(unmeasured.popleft()[0])
+            if entry is not None:
+                size = approx_size(entry["event"])
+                self._bytes += size - entry["size"]
+                entry["size"] = size
+
+    def _evict(self) -> List[Tuple[Any, Any]]:
+        evicted = []
+        entries = self._entries
+
+        while len(entries) > 1 and (
+            (self._max_events is not None and len(entries) > self._max_events)
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            uuid, entry = entries.popitem(last=False)
+            self._bytes -= entry["size"]
+            evicted.append((uuid, entry["event"]))
+
+        self.evicted += len(evicted)
+        return evicted
+
+    def get(self, uuid: Any) -> Optional[dict]:
+        if not self._lru and not self._sized:
+            return self._entries.get(uuid)
+
+        with self._lock:
+            entry = self._entries.get(uuid)
+            if entry is None:
+                return None
+
+            if self._lru:
+                # keep the entries ordered by ts so expiry can still stop at the first fresh one
+                self._entries.move_to_end(uuid)
+                entry["ts"] = max(entry["ts"], self._last_ts)
+                entry["seq"] = next(self._sequence)
+            if self._sized:
+                size = approx_size(entry["event"])
+                self._bytes += size - entry["size"]
+                entry["size"] = size
+
+            return entry
+
+    def head(self) -> Optional[int]:
+        with self._lock:
+            for entry in self._entries.values():
+                return entry["seq"]
+
+        return None
+
+    def evict_head(self) -> Optional[Tuple[Any, Any]]:
+        with self._lock:
+            if not self._entries:
+                return None
+
+            uuid, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["size"]
+            self.evicted += 1
+
+            return uuid, entry["event"]
+
+    def pop(self, uuid: Any) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.pop(uuid, None)
+            if entry is not None:
+                self._bytes -= entry["size"]
+            return entry
+
+    def expire(self, before: int) -> List[Tuple[Any, Any]]:
+        expired = []
+
+        with self._lock:
+            entries = self._entries
+            while entries:
+                uuid, entry = next(iter(entries.items()))
+                if entry["ts"] >= before:
+                    break
+                entries.popitem(last=False)
+                self._bytes -= entry["size"]
+                expired.append((uuid, entry["event"]))
+
+        return expired
+
+
+class ShardedEventRegistry:
+    def __init__(
+        self,
+        shards: int = 16,
+        max_events: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = EVICT_OLDEST,
+    ) -> None:
+        if shards < 1:
+            raise ValueError("shards should be positive")
+
+        # caps apply to the total, shards only share the sequence that orders entries across them
+        sequence = count()
+        self._shards = tuple(
+            EventRegistry(eviction_policy=eviction_policy, sequence=sequence, sized=max_bytes is not None)
+            for _ in range(shards)
+        )
+        self._max_events = max_events
+        self._max_bytes = max_bytes
+        self._evict_lock = threading.Lock()
+
+    def _shard(self, uuid: Any) -> EventRegistry:
+        return self._shards[hash(uuid) % len(self._shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, uuid: Any) -> bool:
+        return uuid in self._shard(uuid)
+
+    def __getitem__(self, uuid: Any) -> dict:
+        return self._shard(uuid)[uuid]
+
+    @property
+    def bytes(self) -> int:
+        return sum(shard.bytes for shard in self._shards)
+
+    @property
+    def evicted(self) -> int:
+        return sum(shard.evicted for shard in self._shards)
+
+    def add(self, uuid: Any, event: Any, ts: int) -> List[Tuple[Any, Any]]:
+        self._shard(uuid).add(uuid, event, ts)
+        if not self._over():
+            return []
+
+        return self._evict()
+
+    def _over(self) -> bool:
+        return (
+            (self._max_events is not None and len(self) > self._max_events)
+            or (self._max_bytes is not None and self.bytes > self._max_bytes)
+        )
+
+    def _evict(self) -> List[Tuple[Any, Any]]:
+        evicted = []
+
+        with self._evict_lock:
+            while len(self) > 1 and self._over():
+                heads = [(shard.head(), shard) for shard in self._shards]
+                heads = [(seq, shard) for seq, shard in heads if seq is not None]
+                if not heads:
+                    break
+                item = min(heads, key=lambda head: head[0])[1].evict_head()
+                if item is not None:
+                    evicted.append(item)
+
+        return evicted
+
+    def get(self, uuid: Any) -> Optional[dict]:
+        return self._shard(uuid).get(uuid)
+
+    def pop(self, uuid: Any) -> Optional[dict]:
+        return self._shard(uuid).pop(uuid)
+
+    def expire(self, before: int) -> List[Tuple[Any, Any]]:
+        expired = []
+        for shard in self._shards:
+            expired.extend(shard.expire(before))
+
+        return expired
@@ -0,0 +1,121 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        jitter: bool = True,
+        statuses: Iterable[int] = RETRY_STATUSES,
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+
+    def is_retryable(self, status: int) -> bool:
+        return status in self.statuses
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_requests: int = 1,
+    ) -> None:
+        if failure_threshold < 1 or half_open_requests < 1:
+            raise ValueError("failure_threshold and half_open_requests should be positive")
+
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._half_open_requests = half_open_requests
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    def fork(self) -> "CircuitBreaker":
+        return CircuitBreaker(self._failure_threshold, self._reset_timeout, self._half_open_requests)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        if self._state == self.CLOSED:
+            return True
+
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self._reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probes = 0
+
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self._half_open_requests:
+                    return False
+                self._probes += 1
+
+            return True
+
+    def record_success(self) -> None:
+        if self._state == self.CLOSED and not self._failures:
+            return
+
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
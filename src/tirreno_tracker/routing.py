@@ -0,0 +1,70 @@
+import hashlib
+from bisect import bisect
+from typing import Any, List, Optional, Sequence
+
+from .resilience import CircuitBreaker
+
+
+ROUTE_KEYS = ("userName", "ipAddress")
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: Sequence[Any], replicas: int = 64) -> None:
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+        if replicas < 1:
+            raise ValueError("replicas should be positive")
+
+        self.nodes = list(nodes)
+        points = sorted(
+            (_hash(f"{node}#{replica}"), index)
+            for index, node in enumerate(self.nodes)
+            for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._indexes = [index for _, index in points]
+
+    def walk(self, key: str) -> List[Any]:
+        total = len(self.nodes)
+        indexes = self._indexes
+        position = bisect(self._hashes, _hash(key))
+        seen = []
+
+        for i in range(len(indexes)):
+            index = indexes[(position + i) % len(indexes)]
+            if index not in seen:
+                seen.append(index)
+                if len(seen) == total:
+                    break
+
+        return [self.nodes[index] for index in seen]
+
+
+class Endpoint:
+    __slots__ = ("url", "transport", "breaker", "sender")
+
+    def __init__(self, url: str, transport: Any, breaker: Optional[CircuitBreaker], sender: Any = None) -> None:
+        self.url = url
+        self.transport = transport
+        self.breaker = breaker
+        self.sender = sender
+
+    def __repr__(self) -> str:
+        return self.url
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker is None or self.breaker.state != CircuitBreaker.OPEN
+
+
+def route_key(data: dict) -> Optional[str]:
+    for key in ROUTE_KEYS:
+        value = data.get(key)
+        if value:
+            return value
+
+    return None
@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional
+
+from .sender import DEFAULT_PRIORITIES, PRIORITY_HIGH
+
+SAMPLED = "sampled"
+RATE_LIMITED = "rate_limited"
+USER_LIMITED = "user_limited"
+IP_LIMITED = "ip_limited"
+
+DEFAULT_POLICY = "*"
+
+# security events the '*' policy never drops, only a policy naming the type applies to them
+EXEMPT_TYPES = frozenset(event_type for event_type, priority in DEFAULT_PRIORITIES.items() if priority == PRIORITY_HIGH)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "_tokens", "_updated")
+
+    def __init__(self, rate: float, burst: Optional[float] = None, now: Optional[float] = None) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic() if now is None else now
+
+    def take(self, now: float) -> bool:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+
+        self._tokens -= 1.0
+        return True
+
+
+class EventPolicy:
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        per_user_rate: Optional[float] = None,
+        per_ip_rate: Optional[float] = None,
+        max_keys: int = 10000,
+    ) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate should be between 0 and 1")
+        for value in (rate, per_user_rate, per_ip_rate):
+            if value is not None and value <= 0:
+                raise ValueError("rates should be positive")
+        if max_keys < 1:
+            raise ValueError("max_keys should be positive")
+
+        self.sample_rate = sample_rate
+        self.rate = rate
+        self.burst = burst
+        self.per_user_rate = per_user_rate
+        self.per_ip_rate = per_ip_rate
+        self.max_keys = max_keys
+        self._limited = rate is not None or per_user_rate is not None or per_ip_rate is not None
+        self._lock = threading.Lock()
+        self._bucket = TokenBucket(rate, burst) if rate is not None else None
+        self._users = OrderedDict()
+        self._ips = OrderedDict()
+
+    def fork(self) -> "EventPolicy":
+        return EventPolicy(self.sample_rate, self.rate, self.burst, self.per_user_rate, self.per_ip_rate, self.max_keys)
+
+    def check(self, user: Optional[str], ip: Optional[str]) -> Optional[str]:
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return SAMPLED
+        if not self._limited:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            if self.per_user_rate is not None and user and not self._take(self._users, user, self.per_user_rate, now):
+                return USER_LIMITED
+            if self.per_ip_rate is not None and ip and not self._take(self._ips, ip, self.per_ip_rate, now):
+                return IP_LIMITED
+            if self._bucket is not None and not self._bucket.take(now):
+                return RATE_LIMITED
+
+        return None
+
+    def _take(self, buckets: OrderedDict, key: str, rate: float, now: float) -> bool:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, now=now)
+            if len(buckets) > self.max_keys:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+
+        return bucket.take(now)
+
+
+class Sampler:
+    def __init__(self, policies: Dict[str, EventPolicy], exempt: Iterable[str] = EXEMPT_TYPES) -> None:
+        self._policies = dict(policies)
+        self._default = self._policies.get(DEFAULT_POLICY)
+        self._exempt = frozenset(exempt)
+        self._lock = threading.Lock()
+        self._dropped = Counter()
+
+    def fork(self) -> "Sampler":
+        return Sampler({event_type: policy.fork() for event_type, policy in self._policies.items()}, self._exempt)
+
+    def check(self, event_type: Optional[str], user: Optional[str], ip: Optional[str]) -> Optional[str]:
+        policy = self._policies.get(event_type)
+        if policy is None and event_type not in self._exempt:
+            policy = self._default
+        if policy is None:
+            return None
+
+        reason = policy.check(user, ip)
+        if reason is not None:
+            with self._lock:
+                self._dropped[(event_type, reason)] += 1
+
+        return reason
+
+    def sampled_out(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            items = list(self._dropped.items())
+
+        out = {}
+        for (event_type, reason), count in items:
+            out.setdefault(event_type, {})[reason] = count
+
+        return out
@@ -0,0 +1,244 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .buffer import STORAGE_DICT, STORAGES, create_lane
+from .diagnostics import diagnostics
+
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+LANE_WEIGHTS = (4, 2, 1)
+
+DEFAULT_PRIORITIES = {
+    "account_login_fail": PRIORITY_HIGH,
+    "account_registration": PRIORITY_HIGH,
+    "account_email_change": PRIORITY_HIGH,
+    "account_password_change": PRIORITY_HIGH,
+    "field_edit": PRIORITY_HIGH,
+    "page_view": PRIORITY_LOW,
+}
+
+
+def check_priorities(priorities: Dict[str, int]) -> None:
+    for event_type, lane in priorities.items():
+        if lane not in (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW):
+            raise ValueError(f"Unknown priority {lane} for {event_type}, expected PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW")
+
+
+class BatchSender:
+    def __init__(
+        self,
+        send: Callable[[List[dict]], None],
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: str = OVERFLOW_BLOCK,
+        block_timeout: float = 1.0,
+        threads: int = 1,
+        on_drop: Optional[Callable[[List[dict]], None]] = None,
+        lanes: int = 1,
+        weights: Optional[Sequence[int]] = None,
+        storage: str = STORAGE_DICT,
+        on_compact: Optional[Callable[[List[dict]], None]] = None,
+    ) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy}, expected one of {', '.join(OVERFLOW_POLICIES)}")
+        if storage not in STORAGES:
+            raise ValueError(f"Unknown queue storage {storage}, expected one of {', '.join(STORAGES)}")
+        if queue_size < 1 or batch_size < 1 or threads < 1:
+            raise ValueError("queue_size, batch_size and threads should be positive")
+        if block_timeout < 0:
+            raise ValueError("block_timeout should not be negative")
+        weights = tuple(weights) if weights is not None else LANE_WEIGHTS[:lanes] + (1,) * (lanes - len(LANE_WEIGHTS))
+        if lanes < 1 or len(weights) != lanes or min(weights) < 1:
+            raise ValueError("weights should have a positive weight per lane")
+
+        self._send = send
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._overflow_policy = overflow_policy
+        self._block_timeout = block_timeout
+        self._on_drop = on_drop
+
+        self._lanes = [create_lane(storage, on_compact) for _ in range(lanes)]
+        self._weights = weights
+        self._size = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._oldest = None
+        self._in_flight = 0
+        self._flushing = 0
+        self._closed = False
+
+        self.dropped = 0
+        self.taken = 0
+
+        self._threads = []
+        for i in range(threads):
+            thread = threading.Thread(target=self._run, name=f"tirreno-sender-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def depths(self) -> List[int]:
+        return [len(lane) for lane in self._lanes]
+
+    def _lowest(self) -> int:
+        for i in range(len(self._lanes) - 1, -1, -1):
+            if self._lanes[i]:
+                return i
+
+        return -1
+
+    def put(self, item: dict, lane: int = 0) -> bool:
+        dropped = None
+
+        with self._lock:
+            if self._closed:
+                dropped = item
+            else:
+                deadline = None
+                while self._size >= self._queue_size:
+                    # lower priority lanes are shed before any other overflow handling
+                    lowest = self._lowest()
+                    if lowest > lane or self._overflow_policy == OVERFLOW_DROP_OLDEST and lowest == lane:
+                        dropped = self._lanes[lowest].popleft()
+                        self._size -= 1
+                        break
+                    if self._overflow_policy != OVERFLOW_BLOCK:
+                        dropped = item
+                        break
+                    # a stalled sender must not hang the tracking thread, the event is dropped instead
+                    if deadline is None:
+                        deadline = time.monotonic() + self._block_timeout
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        dropped = item
+                        break
+                    self._not_full.wait(remaining)
+
+            if dropped is not item:
+                if not self._size:
+                    self._oldest = time.monotonic()
+                    self._not_empty.notify()
+                self._lanes[lane].append(item)
+                self._size += 1
+                if self._size >= self._batch_size:
+                    self._not_empty.notify()
+
+            if dropped is not None:
+                self.dropped += 1
+
+        if dropped is not None and self._on_drop is not None:
+            self._on_drop([dropped])
+
+        return dropped is not item
+
+    def _take(self) -> Optional[List[dict]]:
+        with self._lock:
+            while True:
+                if self._size:
+                    age = time.monotonic() - self._oldest
+                    if self._size >= self._batch_size or age >= self._flush_interval or self._closed or self._flushing:
+                        break
+                    self._not_empty.wait(self._flush_interval - age)
+                elif self._closed:
+                    return None
+                else:
+                    self._not_empty.wait()
+
+            batch = self._drain(min(self._batch_size, self._size))
+            self._size -= len(batch)
+            self.taken += len(batch)
+            self._oldest = time.monotonic() if self._size else None
+            self._in_flight += 1
+            self._not_full.notify_all()
+
+        return batch
+
+    def _drain(self, count: int) -> List[dict]:
+        lanes = self._lanes
+        if len(lanes) == 1:
+            return [lanes[0].popleft() for _ in range(count)]
+
+        # weighted round robin, a batch takes up to weight items from each lane per round
+        batch = []
+        while len(batch) < count:
+            for lane, weight in zip(lanes, self._weights):
+                for _ in range(min(weight, len(lane), count - len(batch))):
+                    batch.append(lane.popleft())
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            try:
+                self._send(batch)
+            except Exception as e:
+                diagnostics.report(
+                    "sender error",
+                    "Sending batch of %d events failed: %r",
+                    len(batch),
+                    e,
+                    summary="lost in failed batches",
+                    count=len(batch),
+                )
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._not_full.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            self._flushing += 1
+            self._not_empty.notify_all()
+            try:
+                while self._size or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._not_full.wait(remaining)
+            finally:
+                self._flushing -= 1
+
+        return True
+
+    def drain(self) -> List[dict]:
+        with self._lock:
+            items = [item for lane in self._lanes for item in lane]
+            for lane in self._lanes:
+                lane.clear()
+            self._size = 0
+            self._oldest = None
+            self._not_full.notify_all()
+
+        return items
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
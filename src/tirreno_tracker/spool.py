@@ -0,0 +1,290 @@
+import json
+import mmap
+import os
+import shutil
+import threading
+from typing import List, Optional, Tuple
+
+from .diagnostics import diagnostics
+
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".ndjson"
+OFFSET_FILE = "offset.json"
+
+Position = Tuple[int, int]
+
+
+class DiskSpool:
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 4 << 20,
+        max_bytes: int = 256 << 20,
+        use_mmap: bool = False,
+        buffer_size: int = 64 << 10,
+        fsync: bool = False,
+        root: Optional[str] = None,
+    ) -> None:
+        if segment_bytes < 1 or max_bytes < segment_bytes:
+            raise ValueError("segment_bytes should be positive and not exceed max_bytes")
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._directory = directory
+        self._root = root if root is not None else directory
+        self._segment_bytes = segment_bytes
+        self._max_bytes = max_bytes
+        self._use_mmap = use_mmap
+        self._buffer_size = buffer_size
+        self._fsync = fsync
+        self._lock = threading.Lock()
+
+        self._segments = sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        self._position = self._load_position()
+        self._segments = [n for n in self._segments if n >= self._position[0]]
+
+        self.dropped = 0
+
+        # a crash may leave a torn last line, never append after it
+        last = self._segments[-1] if self._segments else self._position[0]
+        if self._segments and not self._ends_with_newline(last):
+            last += 1
+        self._open_writer(last)
+
+    def _options(self) -> dict:
+        return {
+            "segment_bytes": self._segment_bytes,
+            "max_bytes": self._max_bytes,
+            "use_mmap": self._use_mmap,
+            "buffer_size": self._buffer_size,
+            "fsync": self._fsync,
+            "root": self._root,
+        }
+
+    def fork(self) -> "DiskSpool":
+        self._writer.close()
+
+        return DiskSpool(os.path.join(self._root, str(os.getpid())), **self._options())
+
+    def orphans(self) -> List["DiskSpool"]:
+        out = []
+        if not hasattr(os, "fork"):
+            return out
+
+        pid = os.getpid()
+        for name in os.listdir(self._root):
+            path = os.path.join(self._root, name)
+            # <pid> is a worker spool, <pid>.<dead pid> one claimed by that worker
+            owner, _, origin = name.partition(".")
+            if not owner.isdigit() or origin and not origin.isdigit():
+                continue
+            if path == self._directory or not os.path.isdir(path):
+                continue
+
+            if int(owner) != pid:
+                try:
+                    os.kill(int(owner), 0)
+                    continue
+                except ProcessLookupError:
+                    pass
+                except OSError:
+                    continue
+
+                path = self._claim(path, origin or owner)
+                if path is None:
+                    continue
+
+            out.append(DiskSpool(path, **self._options()))
+
+        return out
+
+    def _claim(self, path: str, origin: str) -> Optional[str]:
+        # rename is atomic, so only one surviving worker adopts a dead worker's spool
+        claimed = os.path.join(self._root, f"{os.getpid()}.{origin}")
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return None
+
+        return claimed
+
+    def remove(self) -> None:
+        self.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self._directory, f"{SEGMENT_PREFIX}{segment:010d}{SEGMENT_SUFFIX}")
+
+    def _load_position(self) -> Position:
+        try:
+            with open(os.path.join(self._directory, OFFSET_FILE), "r") as f:
+                data = json.load(f)
+            return int(data["segment"]), int(data["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return (self._segments[0], 0) if self._segments else (0, 0)
+
+    def _ends_with_newline(self, segment: int) -> bool:
+        with open(self._path(segment), "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _open_writer(self, segment: int) -> None:
+        self._writer = open(self._path(segment), "ab", buffering=self._buffer_size)
+        self._writer_segment = segment
+        if segment not in self._segments:
+            self._segments.append(segment)
+
+    def size(self) -> int:
+        with self._lock:
+            self._writer.flush()
+            return self._pending_bytes()
+
+    def _pending_bytes(self) -> int:
+        total = 0
+        for segment in self._segments:
+            try:
+                total += os.path.getsize(self._path(segment))
+            except OSError:
+                pass
+
+        return total - (self._position[1] if self._segments and self._segments[0] == self._position[0] else 0)
+
+    def append(self, records: List[dict]) -> None:
+        if not records:
+            return
+
+        data = b"".join(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in records)
+
+        with self._lock:
+            self._writer.write(data)
+            if self._writer.tell() >= self._segment_bytes:
+                self._rotate()
+            self._enforce_cap()
+
+    def _rotate(self) -> None:
+        self._sync_writer()
+        self._writer.close()
+        self._open_writer(self._writer_segment + 1)
+
+    def _sync_writer(self) -> None:
+        self._writer.flush()
+        if self._fsync:
+            os.fsync(self._writer.fileno())
+
+    def _enforce_cap(self) -> None:
+        dropped = 0
+        while len(self._segments) > 1 and self._pending_bytes() > self._max_bytes:
+            segment = self._segments.pop(0)
+            offset = self._position[1] if segment == self._position[0] else 0
+            path = self._path(segment)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                dropped += f.read().count(b"\n")
+            os.remove(path)
+            self._position = (self._segments[0], 0)
+            self._save_position()
+
+        if dropped:
+            self.dropped += dropped
+            diagnostics.report(
+                "spool full",
+                "Spool exceeded %d bytes, dropping %d oldest events",
+                self._max_bytes,
+                dropped,
+                summary="dropped from the full spool",
+                count=dropped,
+            )
+
+    def read(self, limit: int) -> List[Tuple[dict, Position]]:
+        out = []
+
+        with self._lock:
+            self._writer.flush()
+            segment, offset = self._position
+            for current in self._segments:
+                if current < segment:
+                    continue
+                start = offset if current == segment else 0
+                out.extend(self._read_segment(current, start, limit - len(out)))
+                if len(out) >= limit:
+                    break
+
+        return out
+
+    def _read_segment(self, segment: int, offset: int, limit: int) -> List[Tuple[dict, Position]]:
+        out = []
+
+        with open(self._path(segment), "rb") as f:
+            if self._use_mmap:
+                size = os.fstat(f.fileno()).st_size
+                if size <= offset:
+                    return out
+                with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buf:
+                    while len(out) < limit:
+                        end = buf.find(b"\n", offset)
+                        if end < 0:
+                            break
+                        self._decode(buf[offset:end], (segment, end + 1), out)
+                        offset = end + 1
+            else:
+                f.seek(offset)
+                while len(out) < limit:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    self._decode(line, (segment, offset), out)
+
+        return out
+
+    @staticmethod
+    def _decode(line: bytes, position: Position, out: list) -> None:
+        try:
+            out.append((json.loads(line.decode("utf-8")), position))
+        except ValueError:
+            diagnostics.report(
+                "spool corrupted",
+                "Skipping corrupted spool record at segment %d",
+                position[0],
+                summary="skipped as corrupted spool records",
+            )
+
+    def commit(self, position: Position) -> None:
+        with self._lock:
+            if position <= self._position:
+                return
+
+            segment = position[0]
+            while self._segments and self._segments[0] < segment:
+                os.remove(self._path(self._segments.pop(0)))
+
+            self._position = position
+            self._save_position()
+
+    def _save_position(self) -> None:
+        path = os.path.join(self._directory, OFFSET_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segment": self._position[0], "offset": self._position[1]}, f)
+            f.flush()
+            if self._fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync_writer()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._writer.closed:
+                self._sync_writer()
+                self._writer.close()
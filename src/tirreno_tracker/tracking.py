@@ -1,15 +1,118 @@
-import requests
-from typing import List, Optional, TypeVar
-from uuid import uuid4
-from datetime import datetime, timezone
-from warnings import warn
+import atexit
+import os
+import signal
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from itertools import count, islice
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+from uuid import UUID
+from datetime import datetime, timedelta
+
+from .metrics import Metrics, MetricsHook
+from .registry import ShardedEventRegistry, EVICT_OLDEST
+from .sender import BatchSender, OVERFLOW_BLOCK, PRIORITY_NORMAL, check_priorities
+from .aggregator import AggregatorClient
+from .buffer import STORAGE_COLUMNAR, STORAGE_DICT
+from .coalescing import Coalescer
+from .context import context_var
+from .ids import EventIds, public_uuid
+from .diagnostics import diagnostics
+from .encoding import Encoder, get_encoder
+from .resilience import CircuitBreaker, RetryPolicy, parse_retry_after
+from .routing import Endpoint, HashRing, route_key
+from .sampling import EventPolicy, Sampler
+from .spool import DiskSpool
+from .transport import Transport, TransportError, get_transport
 
 
 PayloadType = TypeVar("PayloadType", bound="Payload")
 EventType = TypeVar("EventType", bound="Event")
 
 
+def compile_dump(
+    name: str,
+    required: Dict[str, str],
+    optional: Dict[str, str],
+    objects: Dict[str, str],
+    namespace: dict,
+    lazy: Optional[Dict[str, str]] = None,
+) -> Callable[[object], Tuple[dict, Optional[List[str]]]]:
+    lazy = lazy or {}
+    for prop in list(required) + list(optional) + list(objects) + list(lazy.values()):
+        if not prop.isidentifier():
+            raise ValueError(f"Property {prop!r} is not a valid attribute name")
+
+    lines = [f"def {name}(self):", "    out = {}", "    missing = None"]
+    for prop, key in required.items():
+        lines.append(f"    value = self.{prop}")
+        if prop in lazy:
+            lines += [
+                "    if value is None:",
+                f"        value = self.{lazy[prop]}()",
+            ]
+        lines += [
+            "    if value is None:",
+            "        if missing is None:",
+            "            missing = []",
+            f"        missing.append({prop!r})",
+            "    else:",
+            f"        out[{key!r}] = value",
+        ]
+    for prop, key in optional.items():
+        lines += [
+            f"    value = self.{prop}",
+            "    if value is not None:",
+            f"        out[{key!r}] = value",
+        ]
+    for prop, key in objects.items():
+        lines += [
+            f"    value = self.{prop}",
+            "    if value is not None:",
+            "        if isinstance(value, list):",
+            f"            out[{key!r}] = [el.dump() for el in value if isinstance(el, Payload)]",
+            "        elif isinstance(value, Payload):",
+            f"            out[{key!r}] = value.dump()",
+        ]
+    lines.append("    return out, missing")
+
+    scope = {}
+    exec("\n".join(lines), namespace, scope)
+
+    return scope[name]
+
+
+EPOCH = datetime(1970, 1, 1)
+
+if hasattr(time, "time_ns"):
+    time_ns = time.time_ns
+else:
+    def time_ns() -> int:
+        return int(time.time() * 1000000000)
+
+
+@lru_cache(maxsize=64)
+def _format_second(seconds: int) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).isoformat(sep=" ")
+
+
+def format_event_time(ns: int) -> str:
+    ms = ns // 1000000
+    return f"{_format_second(ms // 1000)}.{ms % 1000:03d}"
+
+
 class Payload:
+    __slots__ = (
+        "_new_value",
+        "_old_value",
+        "_field_id",
+        "_field_name",
+        "_value",
+    )
+
     PROPERTIES = {
         "_new_value": "new_value",
         "_old_value": "old_value",
@@ -60,18 +163,44 @@ class Payload:
     def get_field_name(self) -> Optional[str]:
         return self._field_name
 
-    def dump(self) -> dict:
-        out = {}
+    @classmethod
+    def _plan(cls) -> Callable[["Payload"], Tuple[dict, None]]:
+        plan = cls.__dict__.get("_DUMP_PLAN")
+        if plan is None:
+            plan = compile_dump(f"_dump_{cls.__name__}", {}, cls.PROPERTIES, {}, globals())
+            cls._DUMP_PLAN = plan
 
-        for prop in self.PROPERTIES:
-            value = getattr(self, prop, None)
-            if value is not None:
-                out[self.PROPERTIES[prop]] = value
+        return plan
 
-        return out
+    def dump(self) -> dict:
+        return self._plan()(self)[0]
 
 
 class Event:
+    __slots__ = (
+        "_uuid",
+        "_event_type",
+        "_event_time",
+        "_event_ns",
+        "_ip_address",
+        "_user_name",
+        "_user_agent",
+        "_browser_language",
+        "_http_code",
+        "_http_method",
+        "_http_referer",
+        "_url",
+        "_page_title",
+        "_payload",
+        "_field_history",
+        "_phone_number",
+        "_email_address",
+        "_first_name",
+        "_last_name",
+        "_full_name",
+        "_user_created",
+    )
+
     DEFAULT_PROPERTIES = {
         "_user_name": "userName",
         "_event_time": "eventTime",
@@ -100,10 +229,15 @@ class Event:
         "_field_history": "fieldHistory",
     }
 
+    LAZY_PROPERTIES = {
+        "_event_time": "_format_event_time",
+    }
+
     def __init__(self, uuid: str) -> None:
         self._uuid = uuid
-        self._event_type = None
+        self._event_type = "page_view"
         self._event_time = None
+        self._event_ns = time_ns()
         self._ip_address = None
         self._user_name = None
         self._user_agent = None
@@ -122,11 +256,8 @@ class Event:
         self._full_name = None
         self._user_created = None
 
-        self.set_event_time_now()
-        self.set_event_type_page_view()
-
     def get_uuid(self) -> str:
-        return self._uuid
+        return public_uuid(self._uuid)
 
     def set_event_type_page_view(self) -> EventType:
         self._event_type = "page_view"
@@ -311,73 +442,152 @@ class Event:
 
     def set_event_time(self, value: str) -> EventType:
         self._event_time = value
+        self._event_ns = None
         return self
 
     def get_event_time(self) -> Optional[str]:
+        if self._event_time is None:
+            return self._format_event_time()
         return self._event_time
 
     def set_event_time_now(self) -> EventType:
-        self._event_time = (
-            datetime.now(timezone.utc)
-            .replace(tzinfo=None)
-            .isoformat(sep=" ", timespec="milliseconds")
-        )
+        self._event_time = None
+        self._event_ns = time_ns()
         return self
 
-    def dump(self) -> dict:
-        out = {}
-
-        value = None
-        missing = []
+    def _format_event_time(self) -> Optional[str]:
+        return format_event_time(self._event_ns) if self._event_ns is not None else None
+
+    @classmethod
+    def _plan(cls) -> Callable[["Event"], Tuple[dict, Optional[List[str]]]]:
+        plan = cls.__dict__.get("_DUMP_PLAN")
+        if plan is None:
+            plan = compile_dump(
+                f"_dump_{cls.__name__}",
+                cls.DEFAULT_PROPERTIES,
+                cls.OPTIONAL_PROPERTIES,
+                cls.OBJ_PROPERTIES,
+                globals(),
+                cls.LAZY_PROPERTIES,
+            )
+            cls._DUMP_PLAN = plan
 
-        for prop in self.DEFAULT_PROPERTIES:
-            value = getattr(self, prop, None)
-            if value is None:
-                missing.append(prop)
-            else:
-                out[self.DEFAULT_PROPERTIES[prop]] = value
+        return plan
 
-        if len(missing):
+    def dump(self) -> dict:
+        out, missing = self._plan()(self)
+        if missing is not None:
             missing = ", ".join(missing)
-            warn(f"Event properties {missing} should not be None")
-
-        for prop in self.OPTIONAL_PROPERTIES:
-            value = getattr(self, prop, None)
-            if value is not None:
-                out[self.OPTIONAL_PROPERTIES[prop]] = value
-
-        for prop in self.OBJ_PROPERTIES:
-            value = getattr(self, prop, None)
-            if value is not None:
-                if isinstance(value, list):
-                    obj = []
-                    for el in value:
-                        if el is not None and isinstance(el, Payload):
-                            obj.append(el.dump())
-                    out[self.OBJ_PROPERTIES[prop]] = obj
-                elif isinstance(value, Payload):
-                    out[self.OBJ_PROPERTIES[prop]] = value.dump()
+            diagnostics.report(
+                f"missing {missing}",
+                "Event properties %s should not be None",
+                missing,
+                summary=f"missing {missing}",
+            )
 
         return out
 
 
-class Tracker:
+def dump_many(events: Iterable[Event]) -> List[dict]:
+    out = []
+    plans = {}
+    missing_counts = Counter()
+
+    for event in events:
+        cls = type(event)
+        plan = plans.get(cls)
+        if plan is None:
+            plan = plans[cls] = cls._plan()
+        data, missing = plan(event)
+        if missing is not None:
+            missing_counts[", ".join(missing)] += 1
+        out.append(data)
+
+    for missing, total in missing_counts.items():
+        diagnostics.report(
+            f"missing {missing}",
+            "Event properties %s should not be None (%d events)",
+            missing,
+            total,
+            summary=f"missing {missing}",
+            count=total,
+        )
+
+    return out
+
+
+FORK_HOOKS = hasattr(os, "register_at_fork")
+
+trackers = weakref.WeakSet()
+
+
+def flush_before_fork() -> None:
+    for tracker in list(trackers):
+        try:
+            tracker._before_fork()
+        except Exception as e:
+            diagnostics.report("fork error", "Preparing tracker for fork failed: %r", e, summary="failed to prepare for fork")
+
+
+def reinit_after_fork() -> None:
+    diagnostics.after_fork()
+    for tracker in list(trackers):
+        # one broken tracker must not leave the others with the parent's threads and locks
+        try:
+            tracker._after_fork()
+        except Exception as e:
+            diagnostics.report("fork error", "Reinitializing tracker after fork failed: %r", e, summary="failed to reinitialize after fork")
+
+
+if FORK_HOOKS:
+    os.register_at_fork(before=flush_before_fork, after_in_child=reinit_after_fork)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+class BaseTracker:
     def __init__(
         self,
-        api_url: str,
+        api_url: Union[str, Sequence[str]],
         api_key: str,
         event_timeout: int = 30,
         connection_timeout: int = 3,
+        max_pending_events: Optional[int] = None,
+        max_pending_bytes: Optional[int] = None,
+        eviction_policy: str = EVICT_OLDEST,
+        registry_shards: int = 16,
+        policies: Optional[Dict[str, EventPolicy]] = None,
     ) -> None:
-        self._url = self.normalize_url(api_url)
+        urls = [api_url] if isinstance(api_url, str) else list(api_url)
+        if not urls:
+            raise ValueError("api_url should not be empty")
+        self._urls = [self.normalize_url(url) for url in urls]
+        self._url = self._urls[0]
         self._headers = {
             "Content-Type": "application/x-www-form-urlencoded",
             "Api-Key": api_key,
         }
         self._timeout = connection_timeout
-        self._events = {}
+        self._registry_options = {
+            "shards": registry_shards,
+            "max_events": max_pending_events,
+            "max_bytes": max_pending_bytes,
+            "eviction_policy": eviction_policy,
+        }
+        self._events = self._create_registry()
         self._event_timeout = event_timeout
+        self._sweeper = None
+        self._expired_at = None
+        self._metrics = Metrics()
+        self._ids = EventIds()
+        self._sampler = Sampler(policies) if policies else None
+        self._coalescer = None
+        self._current = context_var("tirreno_current_event")
 
+    def _create_registry(self) -> ShardedEventRegistry:
+        return ShardedEventRegistry(**self._registry_options)
 
     def normalize_url(self, url: str) -> str:
         url = url if url.endswith('/') else url + '/'
@@ -385,63 +595,705 @@ class Tracker:
 
         return url
 
+    def add_metrics_hook(self, hook: MetricsHook) -> None:
+        self._metrics.add_hook(hook)
+
+    def stats(self) -> dict:
+        out = self._metrics.snapshot()
+        out["events_evicted"] = self._events.evicted
+        out["pending_events"] = len(self._events)
+        out["pending_bytes"] = self._events.bytes
+        if self._sampler is not None:
+            out["sampled_out"] = self._sampler.sampled_out()
+        out.update(self._gauges())
+
+        return out
+
+    def _gauges(self) -> dict:
+        return {}
+
     def create_event(self) -> Event:
-        now = int(datetime.now(timezone.utc).timestamp())
-        diff = now - self._event_timeout
-        uuids = list(self._events.keys())
-        ev = None
-        for uuid in uuids:
-            ev = self._events.get(uuid)
-            if ev and ev.get("ts") is not None and ev.get("ts") < diff:
-                ev = self._events.pop(uuid)
-                if ev is not None:
-                    ev = ev.get("event")
-                    if ev is not None:
-                        content = ev.dump()
-                        warn(f"Event {uuid} was outdated, dropping event with content {str(content)}")
-
-        uuid = uuid4()
-        self._events[uuid] = {
-            "event": Event(uuid),
-            "ts": now,
-        }
+        uuid = self._ids.next()
+        event = Event(uuid)
+        now = event._event_ns // 1000000000
+        # registry timestamps are whole seconds, one sweep per second finds everything outdated
+        if self._sweeper is None and now != self._expired_at:
+            self._expired_at = now
+            self._expire(now)
 
-        return self._events[uuid]["event"]
+        self._report_evicted(self._events.add(uuid, event, now))
+        self._metrics.inc("events_created")
 
-    def get_event(self, uuid: str) -> Optional[Event]:
-        event = self._events.get(uuid, None)
-        return event["event"] if event is not None else None
+        return event
 
-    def track(self, event: Event):
-        uuid = event.get_uuid()
+    @contextmanager
+    def event(self) -> Iterator[Event]:
+        event = Event(self._ids.next())
+        self._metrics.inc("events_created")
 
-        event_collected = self._events.pop(uuid, None)
-        if event_collected is None:
-            warn(
-                f"Tracker misses Event object with uuid {uuid}, create Event objects via Tracker.create_event() method and do not reuse them."
+        token = self._current.set(event)
+        try:
+            yield event
+        finally:
+            self._current.reset(token)
+            self._track_scoped(event)
+
+    def current_event(self) -> Optional[Event]:
+        return self._current.get(None)
+
+    def _track_scoped(self, event: Event) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _report_evicted(evicted: List[Tuple[int, Event]]) -> None:
+        for uuid, _ in evicted:
+            diagnostics.report(
+                "evicted",
+                "Event %s was evicted, pending events registry is full",
+                public_uuid(uuid),
+                summary="evicted from the full pending events registry",
+            )
+
+    def _expire(self, now: int) -> None:
+        expired = self._events.expire(now - self._event_timeout)
+        if expired:
+            self._metrics.inc("events_expired", len(expired))
+
+        for uuid, ev in expired:
+            diagnostics.report(
+                "expired",
+                "Event %s was outdated, dropping event",
+                public_uuid(uuid),
+                summary="dropped as outdated",
             )
-            return self
+            if ev is not None and diagnostics.debug_enabled():
+                diagnostics.logger.debug("Dropped event %s content %s", public_uuid(uuid), ev.dump())
 
-        event = event_collected.get("event")
-        data = event.dump() if event is not None else None
+    def get_event(self, uuid: Union[str, UUID]) -> Optional[Event]:
+        event = self._events.get(uuid.int if isinstance(uuid, UUID) else uuid)
+        return event["event"] if event is not None else None
 
-        if data is None:
-            warn(
-                f"Tracker misses Event object with uuid {uuid}, create Event objects via Tracker.create_event() method and do not reuse them."
+    def _pop(self, event: Event) -> Optional[Event]:
+        uuid = event._uuid
+
+        event_collected = self._events.pop(uuid)
+        event = event_collected.get("event") if event_collected is not None else None
+        if event is None:
+            diagnostics.report(
+                "missing",
+                "Tracker misses Event object with uuid %s, create Event objects via Tracker.create_event() method and do not reuse them.",
+                public_uuid(uuid),
+                summary="tracked without a pending Event object",
             )
-            return self
 
-        self._send(data)
+        return event
+
+    def _shed(self, event: Event) -> bool:
+        if self._sampler is None:
+            return False
+
+        if self._sampler.check(event._event_type, event._user_name, event._ip_address) is None:
+            return False
+
+        self._metrics.inc("events_sampled_out")
+        return True
+
+    def _coalesce(self, event: Event) -> Optional[tuple]:
+        key = self._coalescer.key(event)
+        if not self._coalescer.merge(key):
+            return key
+
+        self._metrics.inc("events_coalesced")
+        return None
+
+    def _collect(self, event: Event) -> Optional[dict]:
+        event = self._pop(event)
+        if event is None:
+            return None
+
+        return self._prepare(event)
+
+    def _prepare(self, event: Event) -> Optional[dict]:
+        if self._shed(event):
+            return None
+
+        key = None
+        if self._coalescer is not None and event._event_type not in self._coalescer.exempt:
+            key = self._coalesce(event)
+            if key is None:
+                return None
+
+        started = time.perf_counter()
+        data = event.dump()
+        self._metrics.observe("dump_seconds", time.perf_counter() - started)
+        self._metrics.inc("events_tracked")
+
+        if key is not None:
+            self._coalescer.remember(key, data)
 
+        return data
+
+
+class Tracker(BaseTracker):
+    def __init__(
+        self,
+        api_url: Union[str, Sequence[str]],
+        api_key: str,
+        event_timeout: int = 30,
+        connection_timeout: int = 3,
+        async_mode: bool = False,
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow_policy: str = OVERFLOW_BLOCK,
+        block_timeout: float = 1.0,
+        sender_threads: int = 1,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        sweep_interval: Optional[float] = None,
+        max_pending_events: Optional[int] = None,
+        max_pending_bytes: Optional[int] = None,
+        eviction_policy: str = EVICT_OLDEST,
+        registry_shards: int = 16,
+        spool: Optional[DiskSpool] = None,
+        replay_interval: float = 5.0,
+        replay_batch_size: int = 500,
+        encoder: Union[str, Encoder, None] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        fallback: Optional[Callable[[List[dict]], None]] = None,
+        aggregator_path: Optional[str] = None,
+        ring_replicas: int = 64,
+        policies: Optional[Dict[str, EventPolicy]] = None,
+        priorities: Optional[Dict[str, int]] = None,
+        lane_weights: Optional[Sequence[int]] = None,
+        coalescer: Optional[Coalescer] = None,
+        queue_storage: str = STORAGE_DICT,
+        transport: Union[str, Transport, None] = None,
+    ) -> None:
+        super().__init__(
+            api_url,
+            api_key,
+            event_timeout=event_timeout,
+            connection_timeout=connection_timeout,
+            max_pending_events=max_pending_events,
+            max_pending_bytes=max_pending_bytes,
+            eviction_policy=eviction_policy,
+            registry_shards=registry_shards,
+            policies=policies,
+        )
+        self._encoder = get_encoder(encoder)
+        self._headers.update(self._encoder.headers())
+        self._spool = spool
+        self._retry = retry
+        if circuit_breaker is None and len(self._urls) > 1:
+            circuit_breaker = CircuitBreaker()
+        self._breaker = circuit_breaker
+        self._ring_replicas = ring_replicas
+        self._round_robin = count()
+        self._fallback = fallback
+        self._aggregator = AggregatorClient(aggregator_path) if aggregator_path is not None else None
+        self._transport = get_transport(transport, pool_connections, pool_maxsize)
+        self._sender_options = None
+        self._sweep_interval = sweep_interval
+        self._replay_options = (replay_interval, replay_batch_size)
+        self._priorities = priorities
+        if coalescer is not None:
+            coalescer.bind(dict(Event.DEFAULT_PROPERTIES, **Event.OPTIONAL_PROPERTIES), Event.LAZY_PROPERTIES)
+        self._coalescer = coalescer
+        if priorities is not None:
+            check_priorities(priorities)
+
+        if async_mode:
+            self._sender_options = {
+                "queue_size": queue_size,
+                "batch_size": batch_size,
+                "flush_interval": flush_interval,
+                "overflow_policy": overflow_policy,
+                "block_timeout": block_timeout,
+                "threads": sender_threads,
+                "storage": queue_storage,
+            }
+            if queue_storage == STORAGE_COLUMNAR:
+                self._sender_options["on_compact"] = self._seal
+            if priorities is not None:
+                self._sender_options.update(lanes=3, weights=lane_weights)
+
+        self._start()
+        trackers.add(self)
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._closed = threading.Event()
+        self._replayer = None
+        self._sweeper = None
+        self._endpoints = []
+
+        for i, url in enumerate(self._urls):
+            breaker = self._breaker if i == 0 or self._breaker is None else self._breaker.fork()
+            transport = self._transport if i == 0 else self._transport.fork()
+            endpoint = Endpoint(url, transport, breaker)
+            if self._sender_options is not None:
+                endpoint.sender = BatchSender(
+                    partial(self._send_batch, endpoint=endpoint),
+                    on_drop=self._drop,
+                    **self._sender_options,
+                )
+            self._endpoints.append(endpoint)
+        self._ring = HashRing(self._endpoints, self._ring_replicas) if len(self._endpoints) > 1 else None
+
+        if self._spool is not None:
+            self._replayer = self._start_thread("tirreno-replayer", self._replay_periodically, *self._replay_options)
+
+        if self._sweep_interval is not None:
+            self._sweeper = self._start_thread("tirreno-sweeper", self._sweep_periodically, self._sweep_interval)
+
+    @staticmethod
+    def _start_thread(name: str, target: Callable, *args) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+
+        return thread
+
+    def _before_fork(self) -> None:
+        if self._spool is not None and not self._closed.is_set():
+            self._spool.flush()
+
+    def _after_fork(self) -> None:
+        if self._closed.is_set():
+            return
+
+        # locks, sockets, queued and pending events inherited from the parent belong to the parent
+        self._events = self._create_registry()
+        self._ids = EventIds()
+        self._metrics = self._metrics.fork()
+        if self._sampler is not None:
+            self._sampler = self._sampler.fork()
+        if self._coalescer is not None:
+            self._coalescer = self._coalescer.fork()
+        if self._breaker is not None:
+            self._breaker = self._breaker.fork()
+        self._transport = self._transport.fork()
+        if self._spool is not None:
+            self._spool = self._spool.fork()
+        if self._aggregator is not None:
+            self._aggregator = AggregatorClient(self._aggregator.path)
+
+        self._start()
+
+    def _check_fork(self) -> None:
+        if self._pid != os.getpid():
+            self._after_fork()
+
+    def __enter__(self) -> "Tracker":
         return self
 
-    def _send(self, data: dict):
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def flush(self, timeout: Optional[float] = None) -> Tuple[int, int]:
+        senders = self._senders()
+        if not senders:
+            return 0, 0
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        taken = sum(sender.taken for sender in senders)
+        for sender in senders:
+            sender.flush(_remaining(deadline))
+
+        abandoned = self._abandon(senders)
+        return sum(sender.taken for sender in senders) - taken, abandoned
+
+    def close(self, timeout: Optional[float] = None) -> Tuple[int, int]:
+        if self._closed.is_set():
+            return 0, 0
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed, abandoned = self.flush(timeout)
+        self._closed.set()
+
+        senders = self._senders()
+        taken = sum(sender.taken for sender in senders)
+        for sender in senders:
+            sender.stop(_remaining(deadline))
+        flushed += sum(sender.taken for sender in senders) - taken
+        abandoned += self._abandon(senders)
+
+        if self._spool is not None:
+            self._replayer.join(_remaining(deadline))
+            self._spool.close()
+        if self._aggregator is not None:
+            self._aggregator.close()
+        for endpoint in self._endpoints:
+            endpoint.transport.close()
+        diagnostics.flush()
+
+        return flushed, abandoned
+
+    def _senders(self) -> List[BatchSender]:
+        return [endpoint.sender for endpoint in self._endpoints if endpoint.sender is not None]
+
+    def _abandon(self, senders: List[BatchSender]) -> int:
+        items = [item for sender in senders for item in sender.drain()]
+        if not items:
+            return 0
+
+        self._seal(items)
+        self._metrics.inc("events_abandoned", len(items))
+        diagnostics.report(
+            "abandoned",
+            "%d queued events were not sent before the deadline",
+            len(items),
+            summary="not sent before the deadline",
+            count=len(items),
+        )
+        self._spill(items)
+
+        return len(items)
+
+    def install_shutdown_hooks(
+        self,
+        timeout: Optional[float] = 5.0,
+        signals: Iterable[int] = (signal.SIGTERM,),
+    ) -> None:
+        atexit.register(self.close, timeout)
+
+        for signum in signals:
+            signal.signal(signum, partial(self._on_signal, timeout, signal.getsignal(signum)))
+
+    def _on_signal(self, timeout: Optional[float], previous: object, signum: int, frame: object) -> None:
+        # the interrupted code may hold sender locks, so close from another thread with a bounded wait
+        closer = threading.Thread(target=self.close, args=(timeout,), name="tirreno-shutdown", daemon=True)
+        closer.start()
+        closer.join(None if timeout is None else timeout + 1.0)
+
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    def _gauges(self) -> dict:
+        senders = [endpoint.sender for endpoint in self._endpoints if endpoint.sender is not None]
+        out = {
+            "queue_depth": sum(len(sender) for sender in senders),
+            "healthy_endpoints": sum(endpoint.healthy for endpoint in self._endpoints),
+        }
+        if senders and self._priorities is not None:
+            out["lane_depths"] = [sum(depths) for depths in zip(*(sender.depths() for sender in senders))]
+
+        return out
+
+    def _sweep_periodically(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self._expire(int(time.time()))
+
+    def _replay_periodically(self, interval: float, batch_size: int) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self._replay(batch_size)
+            except Exception as e:
+                diagnostics.report("replay error", "Replaying spooled events failed: %r", e, summary="failed to replay from the spool")
+
+    def _replay(self, batch_size: int) -> int:
+        replayed = self._replay_spool(self._spool, batch_size)
+
+        for orphan in self._spool.orphans():
+            replayed += self._replay_spool(orphan, batch_size)
+            if orphan.read(1):
+                orphan.close()
+            else:
+                orphan.remove()
+
+        return replayed
+
+    def _replay_spool(self, spool: DiskSpool, batch_size: int) -> int:
+        replayed = 0
+
+        while not self._closed.is_set():
+            records = spool.read(batch_size)
+            if not records:
+                break
+
+            position = None
+            results = self._deliver([data for data, _ in records])
+            for (_, record_position), ok in zip(records, results):
+                if not ok:
+                    break
+                position = record_position
+                replayed += 1
+
+            if position is not None:
+                spool.commit(position)
+            if position != records[-1][1]:
+                break
+
+        return replayed
+
+    def create_event(self) -> Event:
+        if not FORK_HOOKS:
+            self._check_fork()
+
+        return super().create_event()
+
+    def track(self, event: Event):
+        if not FORK_HOOKS:
+            self._check_fork()
+
+        data = self._collect(event)
+        if data is not None:
+            self._submit(data)
+
+        return self
+
+    def _track_scoped(self, event: Event) -> None:
+        if not FORK_HOOKS:
+            self._check_fork()
+
+        data = self._prepare(event)
+        if data is not None:
+            self._submit(data)
+
+    def _submit(self, data: dict) -> bool:
+        if self._sender_options is not None:
+            if self._priorities is None:
+                return self._route(data).sender.put(data)
+            return self._route(data).sender.put(data, self._priorities.get(data.get("eventType"), PRIORITY_NORMAL))
+
+        return self._send(data)
+
+    def _candidates(self, data: dict) -> List[Endpoint]:
+        if self._ring is None:
+            return self._endpoints
+
+        key = route_key(data)
+        if key is None:
+            start = next(self._round_robin) % len(self._endpoints)
+            return self._endpoints[start:] + self._endpoints[:start]
+
+        return self._ring.walk(key)
+
+    def _route(self, data: dict) -> Endpoint:
+        candidates = self._candidates(data)
+        for endpoint in candidates:
+            if endpoint.healthy:
+                return endpoint
+
+        return candidates[0]
+
+    def track_many(
+        self,
+        events: Iterable[Event],
+        chunk_size: int = 100,
+        on_result: Optional[Callable[[Event, bool], None]] = None,
+    ) -> Tuple[int, int]:
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be positive")
+        if not FORK_HOOKS:
+            self._check_fork()
+
+        sent = failed = 0
+        events = iter(events)
+
+        while True:
+            chunk = list(islice(events, chunk_size))
+            if not chunk:
+                break
+
+            collected = []
+            keys = []
+            for event in chunk:
+                # sampled out events are reported as failed, coalesced ones as sent with their duplicate
+                popped = self._pop(event)
+                ok = False
+                if popped is not None and not self._shed(popped):
+                    key = ()
+                    if self._coalescer is not None and popped._event_type not in self._coalescer.exempt:
+                        key = self._coalesce(popped)
+                    if key is not None:
+                        collected.append(popped)
+                        keys.append(key)
+                        continue
+                    ok = True
+
+                if ok:
+                    sent += 1
+                else:
+                    failed += 1
+                if on_result is not None:
+                    on_result(event, ok)
+
+            if not collected:
+                continue
+
+            started = time.perf_counter()
+            batch = dump_many(collected)
+            self._metrics.observe("dump_seconds", (time.perf_counter() - started) / len(collected))
+            self._metrics.inc("events_tracked", len(collected))
+            if self._coalescer is not None:
+                for key, data in zip(keys, batch):
+                    if key:
+                        self._coalescer.remember(key, data)
+            if self._sender_options is not None:
+                results = [self._submit(data) for data in batch]
+            else:
+                results = self._send_many(batch)
+
+            for event, ok in zip(collected, results):
+                if ok:
+                    sent += 1
+                else:
+                    failed += 1
+                if on_result is not None:
+                    on_result(event, ok)
+
+        return sent, failed
+
+    def _send_batch(self, batch: List[dict], endpoint: Optional[Endpoint] = None):
+        self._send_many(batch, endpoint)
+
+    def _send_many(self, batch: List[dict], endpoint: Optional[Endpoint] = None) -> List[bool]:
+        results = self._deliver(batch, endpoint)
+
+        failed = [data for data, ok in zip(batch, results) if not ok]
+        if failed:
+            self._spill(failed)
+
+        return results
+
+    def _seal(self, batch: List[dict]) -> None:
+        if self._coalescer is not None:
+            self._coalescer.seal(batch)
+
+    def _drop(self, batch: List[dict]) -> None:
+        self._seal(batch)
+        self._metrics.inc("events_dropped", len(batch))
+        self._spill(batch)
+
+    def _spill(self, batch: List[dict]) -> None:
         try:
-            requests.post(
-                url=self._url,
-                data=data,
-                headers=self._headers,
-                timeout=self._timeout,
-            )
-        except requests.RequestException as e:
-            warn(e)
+            if self._spool is not None:
+                self._spool.append(batch)
+            elif self._fallback is not None:
+                self._fallback(batch)
+        except Exception as e:
+            diagnostics.report("spill error", "Keeping %d unsent events failed: %r", len(batch), e, summary="lost while spilling")
+
+    def _send(self, data: dict) -> bool:
+        return self._send_many([data])[0]
+
+    def _deliver(self, batch: List[dict], endpoint: Optional[Endpoint] = None) -> List[bool]:
+        metrics = self._metrics
+        metrics.observe("batch_size", len(batch))
+        if self._coalescer is not None:
+            self._coalescer.seal(batch)
+
+        if self._aggregator is not None:
+            results = self._aggregator.send_many(batch)
+        elif self._ring is None:
+            results = self._deliver_to(batch, self._endpoints[0])
+        else:
+            results = self._deliver_routed(batch, endpoint)
+
+        sent = sum(results)
+        if sent:
+            metrics.inc("events_sent", sent)
+        if sent < len(results):
+            metrics.inc("events_failed", len(results) - sent)
+
+        return results
+
+    def _deliver_routed(self, batch: List[dict], endpoint: Optional[Endpoint]) -> List[bool]:
+        results = [False] * len(batch)
+        candidates = []
+        for data in batch:
+            ring = self._candidates(data)
+            if endpoint is not None and ring[0] is not endpoint:
+                ring = [endpoint] + [node for node in ring if node is not endpoint]
+            candidates.append(ring)
+
+        # failed events move to the next node of their own ring walk
+        pending = list(range(len(batch)))
+        for attempt in range(len(self._endpoints)):
+            groups = {}
+            for i in pending:
+                groups.setdefault(candidates[i][attempt], []).append(i)
+
+            pending = []
+            for node, indexes in groups.items():
+                for i, ok in zip(indexes, self._deliver_to([batch[i] for i in indexes], node)):
+                    if ok:
+                        results[i] = True
+                    else:
+                        pending.append(i)
+            if not pending:
+                break
+
+        return results
+
+    def _deliver_to(self, batch: List[dict], endpoint: Endpoint) -> List[bool]:
+        metrics = self._metrics
+
+        if self._encoder.batching:
+            started = time.perf_counter()
+            body = self._encoder.encode_batch(batch)
+            metrics.observe("encode_seconds", (time.perf_counter() - started) / len(batch))
+            return [self._post(body, endpoint)] * len(batch)
+
+        results = []
+        for data in batch:
+            started = time.perf_counter()
+            body = self._encoder.encode(data)
+            metrics.observe("encode_seconds", time.perf_counter() - started)
+            results.append(self._post(body, endpoint))
+
+        return results
+
+    def _post(self, body: bytes, endpoint: Endpoint) -> bool:
+        breaker = endpoint.breaker
+        retry = self._retry
+        attempt = 0
+
+        while True:
+            if breaker is not None and not breaker.allow():
+                return False
+
+            status = None
+            retry_after = None
+            error = None
+            started = time.perf_counter()
+            try:
+                status, headers = endpoint.transport.post(endpoint.url, body, self._headers, self._timeout)
+            except TransportError as e:
+                error = e
+            self._metrics.observe("send_latency_seconds", time.perf_counter() - started)
+            self._metrics.inc("requests")
+
+            if error is not None:
+                diagnostics.report("request error", "Sending event failed: %s", error, summary="failed to send")
+            else:
+                self._metrics.inc("bytes_sent", len(body))
+                if status is None or status < 500 and status != 429:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return True
+
+                diagnostics.report(
+                    "status",
+                    "Tirreno sensor responded with status %s",
+                    status,
+                    summary="rejected by the sensor",
+                )
+                retry_after = parse_retry_after(headers.get("Retry-After"))
+
+            if breaker is not None:
+                breaker.record_failure()
+
+            if retry is None or attempt >= retry.retries:
+                return False
+            if status is not None and not retry.is_retryable(status):
+                return False
+            if self._closed.wait(retry.delay(attempt, retry_after)):
+                return False
+            attempt += 1
+            self._metrics.inc("retries")
@@ -0,0 +1,138 @@
+import gzip
+import json
+import threading
+from typing import List, Mapping, Optional, Tuple, Union
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+
+class TransportError(Exception):
+    pass
+
+
+class Transport:
+    def post(self, url: str, body: bytes, headers: dict, timeout: float) -> Tuple[Optional[int], Mapping]:
+        raise NotImplementedError
+
+    def fork(self) -> "Transport":
+        # used for every further endpoint and in forked children, override to not share connections
+        return self
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10) -> None:
+        self._pool_options = (pool_connections, pool_maxsize)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, url: str, body: bytes, headers: dict, timeout: float) -> Tuple[Optional[int], Mapping]:
+        try:
+            response = self.session.post(url=url, data=body, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            raise TransportError(e) from e
+
+        return getattr(response, "status_code", None), getattr(response, "headers", None) or {}
+
+    def fork(self) -> "RequestsTransport":
+        return RequestsTransport(*self._pool_options)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10) -> None:
+        self._pool_options = (pool_connections, pool_maxsize)
+        self._pool = urllib3.PoolManager(num_pools=pool_connections, maxsize=pool_maxsize, retries=False)
+
+    def post(self, url: str, body: bytes, headers: dict, timeout: float) -> Tuple[Optional[int], Mapping]:
+        # no redirects, hooks or environment lookups, retries are left to the tracker
+        try:
+            response = self._pool.urlopen("POST", url, body=body, headers=headers, timeout=timeout, redirect=False)
+        except urllib3.exceptions.HTTPError as e:
+            raise TransportError(e) from e
+
+        return response.status, response.headers
+
+    def fork(self) -> "Urllib3Transport":
+        return Urllib3Transport(*self._pool_options)
+
+    def close(self) -> None:
+        self._pool.clear()
+
+
+class MemoryTransport(Transport):
+    def __init__(self, status: int = 200, headers: Optional[Mapping] = None) -> None:
+        self.status = status
+        self.headers = headers or {}
+        self.sent: List[Tuple[str, bytes]] = []
+        self._lock = threading.Lock()
+
+    def post(self, url: str, body: bytes, headers: dict, timeout: float) -> Tuple[Optional[int], Mapping]:
+        with self._lock:
+            self.sent.append((url, body))
+
+        return self.status, self.headers
+
+    def fork(self) -> "MemoryTransport":
+        # forks record into the same list, so one transport sees every endpoint
+        transport = MemoryTransport(self.status, self.headers)
+        transport.sent = self.sent
+        transport._lock = self._lock
+
+        return transport
+
+
+class FileTransport(Transport):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def post(self, url: str, body: bytes, headers: dict, timeout: float) -> Tuple[Optional[int], Mapping]:
+        if headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        line = json.dumps({"url": url, "body": body.decode("utf-8")}, separators=(",", ":"), ensure_ascii=False)
+
+        try:
+            with self._lock:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line + "\n")
+        except OSError as e:
+            raise TransportError(e) from e
+
+        return 200, {}
+
+    def fork(self) -> "FileTransport":
+        return FileTransport(self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+TRANSPORTS = {
+    "requests": RequestsTransport,
+    "urllib3": Urllib3Transport,
+}
+
+
+def get_transport(transport: Optional[Union[str, Transport]], pool_connections: int, pool_maxsize: int) -> Transport:
+    if transport is None:
+        return RequestsTransport(pool_connections, pool_maxsize)
+    if isinstance(transport, Transport):
+        return transport
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport}, expected one of {', '.join(TRANSPORTS)}")
+
+    return TRANSPORTS[transport](pool_connections, pool_maxsize)
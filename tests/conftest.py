@@ -3,6 +3,7 @@ import os
 import pytest
 import sys
 from pathlib import Path
+from urllib.parse import parse_qsl
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
@@ -16,6 +17,47 @@ pkg = importlib.import_module(PKG)
 Tracker = getattr(pkg, "Tracker")
 Event = getattr(pkg, "Event")
 Payload = getattr(pkg, "Payload")
+diagnostics = importlib.import_module(f"{PKG}.diagnostics").diagnostics
+transport = importlib.import_module(f"{PKG}.transport")
+
+
+class FakeTransport(transport.MemoryTransport):
+    # respond(url, body) may raise, or return a status or a (status, headers) pair, None keeps the default status
+    def __init__(self, respond=None):
+        super().__init__()
+        self.respond = respond
+
+    def post(self, url, body, headers, timeout):
+        response = self.respond(url, body) if self.respond is not None else None
+        status, response_headers = super().post(url, body, headers, timeout)
+        if response is None:
+            return status, response_headers
+
+        return response if isinstance(response, tuple) else (response, response_headers)
+
+    def fork(self):
+        # forks record into the same list and follow later changes to respond
+        forked = FakeTransport(lambda url, body: self.respond(url, body) if self.respond is not None else None)
+        forked.sent = self.sent
+        forked._lock = self._lock
+
+        return forked
+
+    def forms(self):
+        return [dict(parse_qsl(body.decode())) for _, body in self.sent]
+
+
+def _fill(ev):
+    return ev.set_user_name("alice").set_ip_address("1.2.3.4").set_user_agent("UA") \
+        .set_browser_language("en").set_http_method("GET").set_http_referer("https://ref/") \
+        .set_url("https://page/")
+
+
+@pytest.fixture(autouse=True)
+def reset_diagnostics():
+    diagnostics.reset()
+    yield
+    diagnostics.reset()
 
 
 @pytest.fixture
@@ -30,6 +72,15 @@ def EventCls(): return Event
 def PayloadCls(): return Payload
 
 
+@pytest.fixture
+def fill(): return _fill
+
+
+@pytest.fixture
+def fake_transport():
+    return FakeTransport()
+
+
 @pytest.fixture
 def fake_post(monkeypatch):
     calls = {}
@@ -37,12 +88,12 @@ def fake_post(monkeypatch):
     class Resp:
         def __init__(self, status_code=200): self.status_code = status_code
 
-    def _fake(url=None, data=None, headers=None, timeout=None, **kw):
+    def _fake(self, url=None, data=None, headers=None, timeout=None, **kw):
         calls.update(url=url, data=data, headers=headers, timeout=timeout, kw=kw)
         return Resp(200)
 
-    tracking_mod_name = f"{PKG}.tracking"
+    transport_mod_name = f"{PKG}.transport"
     import importlib as _il
-    _il.import_module(tracking_mod_name)
-    monkeypatch.setattr(f"{tracking_mod_name}.requests", "post", _fake)
+    _il.import_module(transport_mod_name)
+    monkeypatch.setattr(f"{transport_mod_name}.requests.Session.post", _fake)
     return calls
@@ -0,0 +1,114 @@
+import os
+import importlib
+import asyncio
+import gzip
+import json
+from urllib.parse import parse_qs
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+
+AsyncTracker = pkg.AsyncTracker
+
+
+class FakeResponse:
+    def __init__(self, session):
+        self._session = session
+
+    async def __aenter__(self):
+        self._session.in_flight += 1
+        self._session.peak = max(self._session.peak, self._session.in_flight)
+        await asyncio.sleep(self._session.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._session.in_flight -= 1
+
+    async def read(self):
+        return b""
+
+
+class FakeSession:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.closed = False
+
+    def post(self, url, data=None, headers=None):
+        self.calls.append(dict(url=url, data=data, headers=headers))
+        return FakeResponse(self)
+
+    async def close(self):
+        self.closed = True
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_track_sends_event(fill):
+    session = FakeSession()
+
+    async def main():
+        t = AsyncTracker(api_url="https://localhost/", api_key="k", session=session)
+        ev = fill(t.create_event())
+        assert t.get_event(ev.get_uuid()) is ev
+        await t.track(ev)
+        assert t.get_event(ev.get_uuid()) is None
+        await t.aclose()
+
+    _run(main())
+
+    assert len(session.calls) == 1
+    call = session.calls[0]
+    assert call["url"] == "https://localhost/sensor/"
+    assert call["headers"]["Api-Key"] == "k"
+    assert call["headers"]["Content-Type"] == "application/x-www-form-urlencoded"
+    assert parse_qs(call["data"].decode())["userName"] == ["alice"]
+    assert not session.closed
+
+
+def test_track_uses_encoder(fill):
+    session = FakeSession()
+
+    async def main():
+        t = AsyncTracker(api_url="https://localhost/", api_key="k", session=session, encoder="gzip")
+        await t.track(fill(t.create_event()))
+
+    _run(main())
+
+    call = session.calls[0]
+    assert call["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(call["data"]))[0]["userName"] == "alice"
+
+
+def test_track_nowait_respects_in_flight_limit_and_aclose_flushes(fill):
+    session = FakeSession(delay=0.01)
+
+    async def main():
+        t = AsyncTracker(api_url="https://localhost/", api_key="k", session=session, max_in_flight=3)
+        for _ in range(10):
+            t.track_nowait(fill(t.create_event()))
+        await t.aclose()
+
+    _run(main())
+
+    assert len(session.calls) == 10
+    assert session.peak == 3
+    assert session.in_flight == 0
+
+
+def test_track_missing_event_warns(EventCls, caplog):
+    async def main():
+        t = AsyncTracker(api_url="https://localhost/", api_key="k", session=FakeSession())
+        await t.track(EventCls("fake-uuid"))
+        assert t.track_nowait(EventCls("fake-uuid")) is None
+
+    _run(main())
+    assert any("Tracker misses Event object" in r.getMessage() for r in caplog.records)
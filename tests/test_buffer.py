@@ -0,0 +1,63 @@
+import os
+import json
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+buffer = importlib.import_module(f"{PKG}.buffer")
+encoding = importlib.import_module(f"{PKG}.encoding")
+sender = importlib.import_module(f"{PKG}.sender")
+
+Tracker = pkg.Tracker
+ColumnarLane = buffer.ColumnarLane
+
+
+def test_rows_keep_order_and_shape():
+    compacted = []
+    lane = ColumnarLane(hot_rows=2, chunk_rows=3, on_compact=compacted.extend)
+    rows = [{"i": i, "url": "/a"} if i % 2 else {"url": "/b", "i": i, "payload": [i]} for i in range(11)]
+    for data in rows:
+        lane.append(data)
+
+    assert len(compacted) == 8
+    assert len(lane) == 11
+    assert list(lane) == rows
+    assert [list(lane.popleft()) for _ in range(3)] == [list(data) for data in rows[:3]]
+    assert [lane.popleft() for _ in range(8)] == rows[3:]
+    assert len(lane) == 0
+    with pytest.raises(IndexError):
+        lane.popleft()
+
+
+def test_values_are_dictionary_encoded_per_chunk():
+    lane = ColumnarLane(hot_rows=1, chunk_rows=2)
+    for code in (1, True, 1, 1.0):
+        lane.append({"userAgent": "".join(["Mozilla/", "5.0"]), "httpCode": code})
+    lane.append({})
+
+    rows = [lane.popleft() for _ in range(4)]
+    assert [type(data["httpCode"]) for data in rows] == [int, bool, int, float]
+    assert rows[0]["userAgent"] is rows[1]["userAgent"]
+    assert rows[1]["userAgent"] is not rows[2]["userAgent"]
+
+
+def test_unknown_storage():
+    with pytest.raises(ValueError):
+        sender.BatchSender(lambda batch: None, storage="nope")
+
+
+def test_compacted_events_are_sealed(monkeypatch, fake_transport):
+    monkeypatch.setattr(buffer, "HOT_ROWS", 1)
+
+    t = Tracker(api_url="https://localhost/", api_key="k", encoder=encoding.JsonEncoder(batch=True),
+                transport=fake_transport, async_mode=True, flush_interval=60, queue_storage=buffer.STORAGE_COLUMNAR,
+                coalescer=pkg.Coalescer())
+    for url in ("/a", "/a", "/b", "/c", "/a"):
+        t.track(t.create_event().set_user_name("bot").set_ip_address("6.6.6.6").set_url(url)
+                .set_user_agent("UA").set_browser_language("en").set_http_method("GET").set_http_referer("/"))
+    t.close(timeout=5)
+
+    bodies = [data for _, body in fake_transport.sent for data in json.loads(body)]
+    assert [(d["url"], d.get("repeatCount")) for d in bodies] == [("/a", 2), ("/b", None), ("/c", None), ("/a", None)]
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+import json
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+encoding = importlib.import_module(f"{PKG}.encoding")
+coalescing = importlib.import_module(f"{PKG}.coalescing")
+
+Tracker = pkg.Tracker
+Coalescer = pkg.Coalescer
+
+
+def _event(tracker, url="/a"):
+    return tracker.create_event().set_user_name("bot").set_ip_address("6.6.6.6").set_user_agent("UA") \
+        .set_url(url).set_http_method("GET")
+
+
+def test_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        Tracker(api_url="https://localhost/", api_key="k", coalescer=Coalescer(fields=("nope",)))
+
+
+def test_merge_within_window_and_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(coalescing.time, "monotonic", lambda: now[0])
+    c = Coalescer(fields=("userName",), window=1.0)
+    c.bind({"_user_name": "userName"})
+
+    data = {"userName": "bot"}
+    assert not c.merge(("bot",))
+    c.remember(("bot",), data)
+    now[0] += 0.9
+    assert c.merge(("bot",))
+    now[0] += 0.9
+    assert c.merge(("bot",))
+    assert data["repeatCount"] == 3
+
+    now[0] += 1.1
+    assert not c.merge(("bot",))
+
+
+def test_sealed_survivors_are_not_updated():
+    c = Coalescer(fields=("userName",))
+    c.bind({"_user_name": "userName"})
+    data = {"userName": "bot"}
+    c.remember(("bot",), data)
+
+    c.seal([data])
+    assert not c.merge(("bot",))
+    assert "repeatCount" not in data
+    assert len(c) == 0
+
+
+def test_queued_duplicates_are_collapsed(fake_transport):
+    t = Tracker(api_url="https://localhost/", api_key="k", encoder=encoding.JsonEncoder(batch=True),
+                transport=fake_transport, async_mode=True, flush_interval=60, coalescer=Coalescer())
+    t.track(_event(t))
+    for _ in range(4):
+        t.track(_event(t))
+    t.track(_event(t, url="/b"))
+    t.close(timeout=5)
+
+    bodies = [data for _, body in fake_transport.sent for data in json.loads(body)]
+    assert [(d["url"], d.get("repeatCount")) for d in bodies] == [("/a", 5), ("/b", None)]
+    assert t.stats()["events_coalesced"] == 4
+
+
+def test_lazy_event_time_is_part_of_the_key(monkeypatch):
+    now = [1700000000 * 10 ** 9]
+    monkeypatch.setattr(tr, "time_ns", lambda: now[0])
+    memory = transport.MemoryTransport()
+    t = Tracker(api_url="https://localhost/", api_key="k", encoder=encoding.JsonEncoder(batch=True), transport=memory,
+                async_mode=True, flush_interval=60, coalescer=Coalescer(fields=("eventType", "userName", "eventTime")))
+    for _ in range(2):
+        t.track(_event(t))
+    for _ in range(3):
+        now[0] += 200 * 10 ** 6
+        t.track(_event(t))
+    t.close(timeout=5)
+
+    bodies = [data for _, body in memory.sent for data in json.loads(body)]
+    assert [d.get("repeatCount") for d in bodies] == [2, None, None, None]
+    assert t.stats()["events_coalesced"] == 1
+
+
+def test_dropped_events_are_sealed():
+    release = threading.Event()
+
+    class Gate(transport.MemoryTransport):
+        def post(self, url, body, headers, timeout):
+            release.wait(5)
+            return super().post(url, body, headers, timeout)
+
+    gate = Gate()
+    t = Tracker(api_url="https://localhost/", api_key="k", encoder=encoding.JsonEncoder(batch=True), transport=gate,
+                async_mode=True, queue_size=2, flush_interval=0.01, overflow_policy="drop_oldest",
+                coalescer=Coalescer())
+    t.track(_event(t, url="/blocker"))
+    sender = t._endpoints[0].sender
+    while not sender.taken:
+        time.sleep(0.001)
+
+    for url in ("/a", "/b", "/c", "/a"):
+        t.track(_event(t, url=url))
+    release.set()
+    t.close(timeout=5)
+
+    bodies = [data for _, body in gate.sent for data in json.loads(body)]
+    assert [d["url"] for d in bodies] == ["/blocker", "/c", "/a"]
+    assert t.stats()["events_coalesced"] == 0
+
+
+def test_security_events_are_not_coalesced():
+    memory = transport.MemoryTransport()
+    t = Tracker(api_url="https://localhost/", api_key="k", encoder=encoding.JsonEncoder(batch=True), transport=memory,
+                async_mode=True, flush_interval=60, coalescer=Coalescer())
+    for _ in range(3):
+        t.track(_event(t).set_event_type_account_login_fail())
+    t.close(timeout=5)
+
+    bodies = [data for _, body in memory.sent for data in json.loads(body)]
+    assert [d.get("repeatCount") for d in bodies] == [None] * 3
+
+
+def test_track_many_reports_coalesced_events():
+    memory = transport.MemoryTransport()
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=memory, async_mode=True, flush_interval=60,
+                coalescer=Coalescer())
+    results = []
+
+    events = [_event(t) for _ in range(3)]
+    assert t.track_many(events, chunk_size=1, on_result=lambda event, ok: results.append(ok)) == (3, 0)
+    assert results == [True] * 3
+    t.close(timeout=5)
+    assert len(memory.sent) == 1
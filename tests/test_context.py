@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+context = importlib.import_module(f"{PKG}.context")
+
+Tracker = pkg.Tracker
+
+
+def _users(fake_transport):
+    return [d["userName"] for d in fake_transport.forms()]
+
+
+def test_scope_tracks_on_exit_without_registry(fake_transport, fill):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+    assert t.current_event() is None
+
+    with t.event() as ev:
+        assert t.current_event() is ev
+        assert len(t._events) == 0
+        fill(t.current_event()).set_user_name("alice")
+        assert _users(fake_transport) == []
+
+    assert _users(fake_transport) == ["alice"]
+    assert t.current_event() is None
+    assert t.stats()["events_tracked"] == 1
+
+
+def test_nested_scopes_restore_outer_event(fake_transport, fill):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+
+    with t.event() as outer:
+        fill(t.current_event()).set_user_name("outer")
+        with t.event():
+            fill(t.current_event()).set_user_name("inner")
+        assert t.current_event() is outer
+
+    assert _users(fake_transport) == ["inner", "outer"]
+
+
+def test_scope_tracks_when_the_body_raises(fake_transport, fill):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+
+    with pytest.raises(KeyError):
+        with t.event():
+            fill(t.current_event()).set_user_name("alice")
+            raise KeyError("x")
+
+    assert _users(fake_transport) == ["alice"]
+
+
+def test_scopes_are_per_thread(fake_transport, fill):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+    barrier = threading.Barrier(4)
+
+    def worker(i):
+        with t.event():
+            barrier.wait(5)
+            fill(t.current_event()).set_user_name(f"user{i}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(_users(fake_transport)) == ["user0", "user1", "user2", "user3"]
+
+
+@pytest.mark.skipif(context.ContextVar is None, reason="requires contextvars")
+def test_scopes_are_per_task(fake_transport, fill):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+
+    async def handler(i):
+        with t.event():
+            await asyncio.sleep(0.01)
+            fill(t.current_event()).set_user_name(f"task{i}")
+
+    async def main():
+        await asyncio.gather(*(handler(i) for i in range(3)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+    assert sorted(_users(fake_transport)) == ["task0", "task1", "task2"]
+
+
+def test_thread_local_fallback():
+    var = context.ThreadLocalVar("x")
+    token = var.set(1)
+    inner = var.set(2)
+    assert var.get() == 2
+    var.reset(inner)
+    assert var.get() == 1
+    var.reset(token)
+    assert var.get() is None
@@ -0,0 +1,59 @@
+import logging
+import os
+import importlib
+import warnings
+from datetime import datetime, timezone
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+diagnostics_mod = importlib.import_module(f"{PKG}.diagnostics")
+
+Tracker = pkg.Tracker
+Event = pkg.Event
+
+
+def test_repeated_reports_are_rate_limited_and_aggregated(caplog):
+    d = diagnostics_mod.Diagnostics(interval=60)
+    for _ in range(1235):
+        d.report("missing ipAddress", "Event properties %s should not be None", "_ip_address",
+                 summary="missing ipAddress")
+    assert len(caplog.records) == 1
+
+    d.flush()
+    assert len(caplog.records) == 2
+    assert caplog.records[1].getMessage().startswith("1,234 events missing ipAddress in last ")
+
+
+def test_window_expiry_emits_summary_then_message(caplog):
+    d = diagnostics_mod.Diagnostics(interval=0)
+    d.report("a", "first")
+    d.report("a", "second")
+
+    assert [r.getMessage() for r in caplog.records] == ["first", "second"]
+
+
+def test_dump_does_not_use_warnings(caplog):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Event("u").dump()
+
+    assert "should not be None" in caplog.records[0].getMessage()
+    assert caplog.records[0].levelno == logging.WARNING
+
+
+def test_expired_content_only_logged_at_debug(caplog):
+    t = Tracker(api_url="https://localhost/", api_key="k", event_timeout=1, registry_shards=1)
+    old_ts = int(datetime.now(timezone.utc).timestamp()) - 999
+
+    ev = t.create_event().set_user_name("secret-user")
+    t._events[ev._uuid]["ts"] = old_ts
+    t._expired_at = None
+    t._events.pop(t.create_event()._uuid)
+    assert not any("secret-user" in r.getMessage() for r in caplog.records)
+
+    caplog.set_level(logging.DEBUG, logger="tirreno_tracker")
+    ev = t.create_event().set_user_name("secret-user")
+    t._events[ev._uuid]["ts"] = old_ts
+    t._expired_at = None
+    t.create_event()
+    assert any("secret-user" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,72 @@
+import json
+import os
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+
+Event = pkg.Event
+Payload = pkg.Payload
+dump_many = pkg.dump_many
+
+
+def reference_dump(ev):
+    out = {}
+    for prop, key in ev.DEFAULT_PROPERTIES.items():
+        value = ev.get_event_time() if prop == "_event_time" else getattr(ev, prop, None)
+        if value is not None:
+            out[key] = value
+    for prop, key in ev.OPTIONAL_PROPERTIES.items():
+        value = getattr(ev, prop, None)
+        if value is not None:
+            out[key] = value
+    for prop, key in ev.OBJ_PROPERTIES.items():
+        value = getattr(ev, prop, None)
+        if isinstance(value, list):
+            out[key] = [{k: v for p, k in el.PROPERTIES.items() for v in [getattr(el, p)] if v is not None}
+                        for el in value if isinstance(el, Payload)]
+        elif isinstance(value, Payload):
+            out[key] = {k: v for p, k in value.PROPERTIES.items() for v in [getattr(value, p)] if v is not None}
+    return out
+
+
+def _events():
+    full = Event("full").set_user_name("alice").set_ip_address("1.1.1.1").set_user_agent("UA") \
+        .set_browser_language("en").set_http_method("POST").set_http_referer("r").set_url("/u") \
+        .set_page_title("T").set_email_address("a@b").set_http_code(200).set_user_created("x") \
+        .set_event_type_field_edit().set_payload(Payload().set_field_id("f").set_new_value("n")) \
+        .add_field_history(Payload().set_old_value("o")).add_field_history(Payload().set_value("v"))
+    partial = Event("partial").set_user_name("bob").set_url("/p")
+    empty = Event("empty")
+    return [full, partial, empty]
+
+
+@pytest.mark.parametrize("index", [0, 1, 2])
+def test_dump_is_byte_identical(index, caplog):
+    ev = _events()[index]
+    assert json.dumps(ev.dump()) == json.dumps(reference_dump(ev))
+
+
+def test_dump_many_matches_dump(caplog):
+    events = _events()
+    assert json.dumps(dump_many(events)) == json.dumps([reference_dump(ev) for ev in events])
+
+
+def test_dump_many_aggregates_missing_warnings(caplog):
+    events = [Event(f"u{i}") for i in range(5)]
+    dump_many(events)
+
+    assert len(caplog.records) == 1
+    assert "(5 events)" in caplog.records[0].getMessage()
+
+
+def test_plan_follows_subclass_properties(caplog):
+    class Custom(Event):
+        __slots__ = ()
+        OPTIONAL_PROPERTIES = {"_page_title": "title"}
+
+    ev = Custom("c").set_page_title("T").set_event_type_account_login()
+    assert ev.dump()["title"] == "T"
+    assert "eventType" not in ev.dump()
+    assert Event("e").set_page_title("T").dump()["pageTitle"] == "T"
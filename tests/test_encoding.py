@@ -0,0 +1,52 @@
+import gzip
+import json
+import os
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+encoding = importlib.import_module(f"{PKG}.encoding")
+
+Tracker = pkg.Tracker
+Payload = pkg.Payload
+
+
+def _data():
+    ev = pkg.Event("u").set_user_name("alice").set_ip_address("1.1.1.1").set_user_agent("Mozilla/5.0 (X11)") \
+        .set_browser_language("fr-FR,fr;q=0.9").set_http_method("POST").set_http_referer("https://r/?a=1&b=2") \
+        .set_url("/é").set_http_code(200).set_payload(Payload().set_field_id("f").set_new_value("n")) \
+        .add_field_history(Payload().set_old_value("o"))
+    return ev.dump()
+
+
+def test_form_encoder_matches_requests_encoding():
+    data = _data()
+    expected = transport.requests.models.RequestEncodingMixin._encode_params(data)
+    assert encoding.FormEncoder().encode(data) == expected.encode("ascii")
+
+
+def test_json_and_gzip_encoders():
+    data = _data()
+    assert json.loads(encoding.JsonEncoder().encode(data)) == data
+    assert json.loads(gzip.decompress(encoding.GzipEncoder().encode_batch([data, data]))) == [data, data]
+    assert encoding.GzipEncoder().headers() == {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+
+def test_unknown_encoder():
+    with pytest.raises(ValueError):
+        Tracker(api_url="https://localhost/", api_key="k", encoder="xml")
+
+
+def test_gzip_batch_is_one_request(fake_post, caplog):
+    t = Tracker(api_url="https://localhost/", api_key="k", encoder="gzip")
+    events = [t.create_event().set_user_name(f"user-{i}") for i in range(5)]
+    assert t.track_many(events) == (5, 0)
+
+    body = fake_post["data"]
+    assert [d["userName"] for d in json.loads(gzip.decompress(body))] == [f"user-{i}" for i in range(5)]
+    assert fake_post["headers"]["Content-Encoding"] == "gzip"
+    assert fake_post["headers"]["Api-Key"] == "k"
+    assert t.stats()["requests"] == 1
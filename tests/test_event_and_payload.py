@@ -1,11 +1,11 @@
-def test_event_warns_on_missing_defaults(EventCls, recwarn):
+def test_event_warns_on_missing_defaults(EventCls, caplog):
     ev = EventCls("uuid-1")
     out = ev.dump()
     assert isinstance(out, dict)
-    assert any("Event properties" in str(w.message) for w in recwarn.list)
+    assert any("Event properties" in r.getMessage() for r in caplog.records)
 
 
-def test_event_serializes_payload(EventCls, PayloadCls, recwarn):
+def test_event_serializes_payload(EventCls, PayloadCls, caplog):
     ev = EventCls("u-1")
     ev.set_user_name("alice").set_url("https://ex/").set_http_method("GET") \
         .set_ip_address("1.1.1.1").set_user_agent("custom-useragent") \
@@ -21,3 +21,10 @@ def test_event_serializes_payload(EventCls, PayloadCls, recwarn):
     assert "payload" in out and isinstance(out["payload"], dict)
     assert {"field_id": "id1", "old_value": "a", "new_value": "b"}.items() == out["payload"].items()
     #assert {"field_name": "Name"} in out["payload"]
+
+
+def test_event_and_payload_use_slots(EventCls, PayloadCls):
+    ev = EventCls("u-1").set_payload(PayloadCls().set_value("v"))
+    assert not hasattr(ev, "__dict__")
+    assert not hasattr(ev.get_payload(), "__dict__")
+    assert ev.get_payload().dump() == {"value": "v"}
@@ -25,14 +25,14 @@ def test_event_time_set_now_parses_and_is_recent():
     assert abs((now - dt).total_seconds()) < 5
 
 
-def test_event_time_manual_set_preserved(recwarn):
+def test_event_time_manual_set_preserved(caplog):
     ev = Event("u-manual")
     custom = "2024-01-02 03:04:05.123"
     ev.set_event_time(custom)
     assert ev.get_event_time() == custom
     d = ev.dump()
     assert d.get("eventTime") == custom
-    assert any("Event properties" in str(w.message) for w in recwarn.list)
+    assert any("Event properties" in r.getMessage() for r in caplog.records)
 
 
 @pytest.mark.parametrize(
@@ -65,3 +65,28 @@ def test_event_time_present_in_tracker_created_event():
     ts = ev.get_event_time()
     assert ts and isinstance(ts, str)
     _ = _parse_event_time(ts)
+
+
+@pytest.mark.parametrize("ns", [0, 1704164645123456789, 1704164645999999999, 951782400000000000])
+def test_deferred_event_time_matches_datetime_format(ns):
+    expected = datetime.fromtimestamp(ns // 1000000 / 1000, timezone.utc).replace(tzinfo=None) \
+        .isoformat(sep=" ", timespec="milliseconds")
+    assert tracking.format_event_time(ns) == expected
+
+
+def test_event_time_is_formatted_on_dump():
+    ev = Event("u-lazy").set_user_name("a")
+    assert ev._event_time is None
+    assert ev.dump()["eventTime"] == ev.get_event_time()
+
+
+def test_tracker_event_uuids_are_uuid4_and_resolvable():
+    import uuid
+
+    t = Tracker(api_url="https://localhost/tirreno/sensor/", api_key="k")
+    first, second = t.create_event(), t.create_event()
+
+    assert isinstance(first.get_uuid(), uuid.UUID)
+    assert first.get_uuid().version == 4
+    assert first.get_uuid() != second.get_uuid()
+    assert t.get_event(first.get_uuid()) is first
@@ -0,0 +1,150 @@
+import os
+import time
+from urllib.parse import parse_qsl
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+aggregator = importlib.import_module(f"{PKG}.aggregator")
+
+Tracker = pkg.Tracker
+DiskSpool = pkg.DiskSpool
+CircuitBreaker = pkg.CircuitBreaker
+
+needs_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def _event(tracker, user="u1"):
+    event = tracker.create_event()
+    event.set_user_name(user).set_ip_address("1.1.1.1").set_url("https://example.com").set_http_method("GET")
+    return event
+
+
+def _dead_pid():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return pid
+
+
+@needs_fork
+def test_after_fork_rebuilds_state(tmp_path, fake_post):
+    breaker = CircuitBreaker()
+    t = Tracker("https://x", "k", async_mode=True, spool=DiskSpool(str(tmp_path)), circuit_breaker=breaker)
+    _event(t)
+    endpoint, events, metrics = t._endpoints[0], t._events, t._metrics
+    endpoint.sender.stop()
+
+    t._after_fork()
+
+    assert t._endpoints[0].transport.session is not endpoint.transport.session
+    assert t._endpoints[0].sender is not endpoint.sender
+    assert t._events is not events and len(t._events) == 0
+    assert t._metrics is not metrics
+    assert t._endpoints[0].breaker is not breaker
+    assert t._spool._directory == os.path.join(str(tmp_path), str(os.getpid()))
+
+    t.track(_event(t))
+    t.close()
+    assert dict(parse_qsl(fake_post["data"].decode()))["userName"] == "u1"
+
+
+@needs_fork
+def test_forked_child_sends_with_its_own_session(fake_post):
+    t = Tracker("https://x", "k")
+    parent_session = id(t._endpoints[0].transport.session)
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            t.track(_event(t, user="child"))
+            ok = id(t._endpoints[0].transport.session) != parent_session and t._pid == os.getpid()
+            user = dict(parse_qsl(fake_post["data"].decode()))["userName"]
+            os.write(write_fd, f"{ok}:{user}".encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 100) == b"True:child"
+    os.close(read_fd)
+    assert t._pid == os.getpid()
+    t.close()
+
+
+@needs_fork
+def test_replay_adopts_spools_of_dead_processes(tmp_path, monkeypatch):
+    orphan = DiskSpool(os.path.join(str(tmp_path), str(_dead_pid())))
+    orphan.append([{"i": 1}, {"i": 2}])
+    orphan.close()
+
+    t = Tracker("https://x", "k", spool=DiskSpool(str(tmp_path)), replay_interval=3600)
+    sent = []
+    monkeypatch.setattr(t, "_deliver", lambda batch: sent.extend(batch) or [True] * len(batch))
+
+    assert t._replay(10) == 2
+    assert sent == [{"i": 1}, {"i": 2}]
+    assert not os.path.exists(orphan._directory)
+    t.close()
+
+
+@needs_fork
+def test_orphans_are_claimed_once(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    dead = _dead_pid()
+    DiskSpool(os.path.join(root, str(dead))).close()
+    spool = DiskSpool(root)
+
+    claimed = spool.orphans()
+    assert [orphan._directory for orphan in claimed] == [os.path.join(root, f"{os.getpid()}.{dead}")]
+    assert not os.path.exists(os.path.join(root, str(dead)))
+    claimed[0].close()
+
+    # another worker renamed it first
+    DiskSpool(os.path.join(root, str(_dead_pid()))).close()
+
+    def lost(src, dst):
+        raise FileNotFoundError(src)
+
+    monkeypatch.setattr(os, "rename", lost)
+    assert [orphan._directory for orphan in spool.orphans()] == [claimed[0]._directory]
+    spool.close()
+
+
+@pytest.mark.skipif(not hasattr(aggregator.socket, "AF_UNIX"), reason="requires Unix sockets")
+def test_aggregator_forwards_events(tmp_path, fake_post):
+    path = str(tmp_path / "agg.sock")
+    upstream = Tracker("https://x", "k")
+    server = aggregator.Aggregator(path, upstream)
+
+    t = Tracker("https://x", "k", aggregator_path=path)
+    t.track(_event(t, user="via-aggregator"))
+
+    deadline = time.monotonic() + 5
+    while "data" not in fake_post and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    t.close()
+    server.close()
+    upstream.close()
+    assert dict(parse_qsl(fake_post["data"].decode()))["userName"] == "via-aggregator"
+    assert not os.path.exists(path)
+
+
+@pytest.mark.skipif(not hasattr(aggregator.socket, "AF_UNIX"), reason="requires Unix sockets")
+def test_aggregator_client_fails_oversized_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(aggregator, "MAX_DATAGRAM", 1024)
+    path = str(tmp_path / "agg.sock")
+    server = aggregator.socket.socket(aggregator.socket.AF_UNIX, aggregator.socket.SOCK_DGRAM)
+    server.bind(path)
+
+    client = aggregator.AggregatorClient(path)
+    assert client.send_many([{"url": "/small"}, {"url": "/" + "x" * 2048}]) == [True, False]
+    assert server.recv(4096) == b'{"url":"/small"}'
+
+    client.close()
+    server.close()
@@ -0,0 +1,92 @@
+import os
+import importlib
+import threading
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+metrics = importlib.import_module(f"{PKG}.metrics")
+
+Tracker = pkg.Tracker
+Event = pkg.Event
+
+
+def test_counters_sum_across_threads():
+    m = metrics.Metrics()
+
+    def work():
+        for _ in range(1000):
+            m.inc("events_created")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert m.snapshot()["events_created"] == 8000
+
+
+def test_shards_of_exited_threads_are_merged():
+    m = metrics.Metrics()
+
+    def work():
+        m.inc("requests")
+        m.observe("batch_size", 3)
+
+    for _ in range(200):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert len(m._shards) < metrics.RETIRE_SHARDS
+    snapshot = m.snapshot()
+    assert snapshot["requests"] == 200
+    assert snapshot["batch_size"]["count"] == 200
+    assert snapshot["batch_size"]["sum"] == 600
+    assert m._shards == []
+
+
+def test_histogram_buckets_are_cumulative():
+    m = metrics.Metrics()
+    for value in (1, 3, 3, 2000):
+        m.observe("batch_size", value)
+
+    snapshot = m.snapshot()["batch_size"]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == 2007
+    assert snapshot["buckets"][1] == 1
+    assert snapshot["buckets"][5] == 3
+    assert snapshot["buckets"][float("inf")] == 4
+
+
+def test_tracker_stats_and_hooks(fake_transport, caplog):
+    def respond(url, body):
+        if b"bob" in body:
+            raise transport.TransportError("down")
+
+    fake_transport.respond = respond
+    observed = []
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+    t.add_metrics_hook(lambda kind, name, value: observed.append((kind, name)))
+
+    t.track(t.create_event().set_user_name("alice"))
+    t.track(t.create_event().set_user_name("bob"))
+    t.create_event()
+    t.track(Event("stray"))
+
+    stats = t.stats()
+    assert stats["events_created"] == 3
+    assert stats["events_tracked"] == 2
+    assert stats["events_sent"] == 1
+    assert stats["events_failed"] == 1
+    assert stats["requests"] == 2
+    assert stats["bytes_sent"] > 0
+    assert stats["pending_events"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["send_latency_seconds"]["count"] == 2
+    assert stats["dump_seconds"]["count"] == 2
+    assert stats["encode_seconds"]["count"] == 2
+    assert ("counter", "events_created") in observed
+    assert ("histogram", "send_latency_seconds") in observed
@@ -0,0 +1,143 @@
+import asyncio
+import os
+from urllib.parse import parse_qsl
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+middleware = importlib.import_module(f"{PKG}.middleware")
+
+Tracker = pkg.Tracker
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _sent(fake_post):
+    return dict(parse_qsl(fake_post["data"].decode()))
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("en-US,en;q=0.9", "en-US"),
+    ("fr;q=0.5, de;q=0.8, *", "de"),
+    ("*", None),
+    ("da, en-gb;q=0.8, en;q=0.7", "da"),
+])
+def test_primary_language(header, expected):
+    assert middleware.primary_language(header) == expected
+
+
+def test_forwarded_for_is_resolved_through_trusted_proxies():
+    proxies = middleware.ProxyResolver(["10.0.0.0/8", "192.168.1.1"])
+
+    assert proxies.resolve("10.0.0.2", "1.1.1.1, 2.2.2.2, 192.168.1.1") == "2.2.2.2"
+    assert proxies.resolve("10.0.0.2", "10.0.0.5") == "10.0.0.5"
+    assert proxies.resolve("3.3.3.3", "1.1.1.1") == "3.3.3.3"
+    assert middleware.ProxyResolver().resolve("10.0.0.2", "1.1.1.1") == "10.0.0.2"
+
+
+def test_wsgi_tracks_after_the_response(fake_post):
+    t = Tracker(api_url="https://localhost/", api_key="k")
+
+    def app(environ, start_response):
+        environ["tirreno.event"].set_user_name("alice")
+        start_response("404 Not Found", [])
+        yield b"missing"
+        assert "data" not in fake_post
+
+    wrapped = middleware.WSGIMiddleware(app, t, trusted_proxies=["10.0.0.0/8"])
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "wsgi.url_scheme": "https",
+        "HTTP_HOST": "example.com",
+        "PATH_INFO": "/login",
+        "QUERY_STRING": "next=/",
+        "REMOTE_ADDR": "10.1.1.1",
+        "HTTP_X_FORWARDED_FOR": "5.5.5.5",
+        "HTTP_USER_AGENT": "UA",
+        "HTTP_ACCEPT_LANGUAGE": "de-CH;q=0.9,fr;q=0.1",
+        "HTTP_REFERER": "https://example.com/",
+    }
+    result = wrapped(environ, lambda status, headers: None)
+    assert list(result) == [b"missing"]
+    result.close()
+
+    expected = {
+        "userName": "alice",
+        "ipAddress": "5.5.5.5",
+        "url": "https://example.com/login?next=/",
+        "httpMethod": "POST",
+        "httpCode": "404",
+        "userAgent": "UA",
+        "browserLanguage": "de-CH",
+        "httpReferer": "https://example.com/",
+    }
+    sent = _sent(fake_post)
+    assert {key: sent.get(key) for key in expected} == expected
+
+
+def test_wsgi_tracks_errors(fake_post):
+    t = Tracker(api_url="https://localhost/", api_key="k")
+
+    def app(environ, start_response):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        middleware.WSGIMiddleware(app, t, user_name=lambda environ: "bob")(
+            {"REQUEST_METHOD": "GET", "wsgi.url_scheme": "http", "SERVER_NAME": "h", "SERVER_PORT": "80"},
+            lambda status, headers: None,
+        )
+
+    assert _sent(fake_post)["httpCode"] == "500"
+    assert _sent(fake_post)["userName"] == "bob"
+
+
+def test_asgi_tracks_after_the_response(fake_post):
+    t = Tracker(api_url="https://localhost/", api_key="k")
+    messages = []
+
+    async def app(scope, receive, send):
+        scope["tirreno.event"].set_user_name("carol")
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        messages.append(message)
+        assert "data" not in fake_post
+
+    scope = {
+        "type": "http",
+        "method": "PUT",
+        "scheme": "https",
+        "path": "/item",
+        "query_string": b"id=1",
+        "client": ("10.0.0.9", 5000),
+        "headers": [(b"host", b"example.com"), (b"x-forwarded-for", b"7.7.7.7"), (b"accept-language", b"pt-BR")],
+    }
+    _run(middleware.ASGIMiddleware(app, t, trusted_proxies=["10.0.0.0/8"])(scope, None, send))
+
+    sent = _sent(fake_post)
+    assert len(messages) == 2
+    assert sent["httpCode"] == "201"
+    assert sent["ipAddress"] == "7.7.7.7"
+    assert sent["url"] == "https://example.com/item?id=1"
+    assert sent["browserLanguage"] == "pt-BR"
+
+
+def test_asgi_passes_other_scopes_through(fake_post):
+    t = Tracker(api_url="https://localhost/", api_key="k")
+    called = []
+
+    async def app(scope, receive, send):
+        called.append(scope["type"])
+
+    _run(middleware.ASGIMiddleware(app, t)({"type": "lifespan"}, None, None))
+
+    assert called == ["lifespan"]
+    assert len(t._events) == 0
@@ -5,6 +5,7 @@ def test_public_api_surface():
     pkg = importlib.import_module(PKG)
 
     assert hasattr(pkg, "Tracker")
+    assert hasattr(pkg, "AsyncTracker")
     assert hasattr(pkg, "Event")
     assert hasattr(pkg, "Payload")
     assert isinstance(pkg.__version__, str)
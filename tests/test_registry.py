@@ -0,0 +1,177 @@
+import os
+import importlib
+import threading
+import time
+from datetime import datetime, timezone
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+registry = importlib.import_module(f"{PKG}.registry")
+tr = importlib.import_module(f"{PKG}.tracking")
+
+Tracker = pkg.Tracker
+EventRegistry = registry.EventRegistry
+ShardedEventRegistry = registry.ShardedEventRegistry
+
+
+def test_expire_only_pops_expired_head():
+    r = EventRegistry()
+    for i in range(5):
+        r.add(f"u{i}", f"e{i}", i)
+
+    assert r.expire(3) == [("u0", "e0"), ("u1", "e1"), ("u2", "e2")]
+    assert len(r) == 2
+    assert r.expire(3) == []
+
+
+def test_expire_skips_tracked_entries():
+    r = EventRegistry()
+    for i in range(3):
+        r.add(f"u{i}", f"e{i}", i)
+    assert r.pop("u0")["event"] == "e0"
+
+    assert r.expire(2) == [("u1", "e1")]
+    assert "u2" in r
+
+
+def test_sweeper_expires_without_create_event(caplog):
+    t = Tracker(api_url="https://localhost/", api_key="k", event_timeout=1, sweep_interval=0.01)
+    ev = t.create_event()
+    t._events[ev._uuid]["ts"] = int(datetime.now(timezone.utc).timestamp()) - 999
+
+    deadline = time.monotonic() + 5
+    while t.get_event(ev.get_uuid()) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    t.close()
+
+    assert t.get_event(ev.get_uuid()) is None
+    assert any("dropping event" in r.getMessage().lower() for r in caplog.records)
+
+
+def test_max_events_evicts_oldest_first():
+    r = EventRegistry(max_events=2)
+    r.add("u0", "e0", 0)
+    r.add("u1", "e1", 1)
+    assert r.add("u2", "e2", 2) == [("u0", "e0")]
+
+    assert "u0" not in r and len(r) == 2
+    assert r.evicted == 1
+
+
+def test_lru_keeps_recently_used():
+    r = EventRegistry(max_events=2, eviction_policy="lru")
+    r.add("u0", "e0", 0)
+    r.add("u1", "e1", 1)
+    r.get("u0")
+    assert r.add("u2", "e2", 2) == [("u1", "e1")]
+
+    assert r.expire(1) == []
+    assert r.expire(3) == [("u0", "e0"), ("u2", "e2")]
+
+
+def test_max_bytes_budget(EventCls):
+    one = registry.approx_size(EventCls("u0"))
+    r = EventRegistry(max_bytes=one * 3)
+    for i in range(10):
+        r.add(f"u{i}", EventCls(f"u{i}"), i)
+
+    assert len(r) == 3
+    assert r.evicted == 7
+    assert r.bytes <= one * 3
+
+    r.pop("u9")
+    assert r.bytes <= one * 2
+
+
+def test_tracker_caps_pending_events(caplog):
+    t = Tracker(api_url="https://localhost/", api_key="k", max_pending_events=3)
+    events = [t.create_event() for _ in range(5)]
+
+    assert len(t._events) == 3
+    assert t._events.evicted == 2
+    assert t.get_event(events[0].get_uuid()) is None
+    assert t.get_event(events[-1].get_uuid()) is events[-1]
+    assert any("evicted" in r.getMessage() for r in caplog.records)
+
+
+def test_sharded_registry_caps_the_total():
+    r = ShardedEventRegistry(shards=4, max_events=8)
+    evicted = []
+    for i in range(100):
+        evicted.extend(r.add(f"u{i}", f"e{i}", i))
+
+    assert len(r) == 8
+    assert evicted == [(f"u{i}", f"e{i}") for i in range(92)]
+    assert r.evicted == 100 - len(r)
+    remaining = len(r)
+    assert len(r.expire(1000)) == remaining
+    assert len(r) == 0
+
+
+def test_concurrent_create_and_track_sends_each_event_once(fake_transport, caplog):
+    t = Tracker(api_url="https://localhost/", api_key="k", sweep_interval=0.001, transport=fake_transport)
+    threads_count, per_thread = 8, 500
+    barrier = threading.Barrier(threads_count)
+    created = [[] for _ in range(threads_count)]
+
+    def worker(n):
+        barrier.wait()
+        for i in range(per_thread):
+            ev = t.create_event().set_user_name(f"{n}-{i}").set_ip_address("1.1.1.1") \
+                .set_user_agent("UA").set_browser_language("en").set_http_method("GET") \
+                .set_http_referer("r").set_url("/")
+            created[n].append(ev)
+            if i % 2:
+                t.track(ev)
+        for ev in created[n][::2]:
+            t.track(ev)
+            t.track(ev)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    t.close()
+
+    assert any("Tracker misses Event object" in r.getMessage() for r in caplog.records)
+
+    expected = {f"{n}-{i}" for n in range(threads_count) for i in range(per_thread)}
+    sent = [d["userName"] for d in fake_transport.forms()]
+    assert len(sent) == len(expected)
+    assert set(sent) == expected
+    assert len(t._events) == 0
+
+
+def test_inline_expiry_runs_once_per_second(monkeypatch):
+    now = [1700000000 * 10 ** 9]
+    monkeypatch.setattr(tr, "time_ns", lambda: now[0])
+    t = Tracker(api_url="https://localhost/", api_key="k")
+    calls = []
+    expire = t._events.expire
+    monkeypatch.setattr(t._events, "expire", lambda before: calls.append(before) or expire(before))
+
+    for _ in range(5):
+        t.create_event()
+    now[0] += 10 ** 9
+    t.create_event()
+
+    assert len(calls) == 2
+
+
+def test_byte_budget_sees_events_filled_after_creation(monkeypatch):
+    now = [1700000000 * 10 ** 9]
+    monkeypatch.setattr(tr, "time_ns", lambda: now[0])
+    t = Tracker(api_url="https://localhost/", api_key="k", max_pending_bytes=50000, registry_shards=1)
+    events = [t.create_event() for _ in range(3)]
+    for ev in events:
+        ev.set_user_agent("x" * 20000)
+    assert t._events.bytes < 20000
+
+    # later adds measure a bounded number of the earlier events again
+    now[0] += 10 ** 9
+    t.create_event()
+    assert t._events.bytes > 40000
+    t.create_event()
+    assert len(t._events) == 4
+    assert t.get_event(events[0].get_uuid()) is None
@@ -0,0 +1,114 @@
+import os
+import importlib
+import time
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+resilience = importlib.import_module(f"{PKG}.resilience")
+
+Tracker = pkg.Tracker
+RetryPolicy = resilience.RetryPolicy
+CircuitBreaker = resilience.CircuitBreaker
+
+
+def _script(fake_transport, responses):
+    calls = []
+
+    def respond(url, body):
+        calls.append(body)
+        response = responses.pop(0) if responses else None
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    fake_transport.respond = respond
+    return calls
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.5, jitter=False)
+    assert [policy.delay(n) for n in range(4)] == [0.1, 0.2, 0.4, 0.5]
+    assert policy.delay(0, retry_after=2) == 0.5
+    assert 0 <= RetryPolicy(backoff=1, max_backoff=1).delay(3) <= 1
+
+
+def test_parse_retry_after():
+    assert resilience.parse_retry_after("3") == 3.0
+    assert resilience.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert resilience.parse_retry_after("soon") is None
+    assert resilience.parse_retry_after(None) is None
+
+
+def test_retries_connect_errors_and_retryable_statuses(fake_transport, caplog):
+    calls = _script(fake_transport, [transport.TransportError("down"), 503, (429, {"Retry-After": "0"}), 200])
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport,
+                retry=RetryPolicy(retries=3, backoff=0.001))
+
+    assert t._send({"userName": "alice"}) is True
+    assert len(calls) == 4
+
+
+def test_gives_up_after_retries_and_spills_to_fallback(fake_transport, caplog):
+    calls = _script(fake_transport, [500] * 10)
+    spilled = []
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport,
+                retry=RetryPolicy(retries=2, backoff=0.001), fallback=spilled.extend)
+
+    assert t._send({"userName": "alice"}) is False
+    assert len(calls) == 3
+    assert spilled == [{"userName": "alice"}]
+
+
+def test_client_errors_are_not_retried(fake_transport, caplog):
+    calls = _script(fake_transport, [400])
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport,
+                retry=RetryPolicy(retries=3, backoff=0.001))
+
+    assert t._send({"userName": "alice"}) is True
+    assert len(calls) == 1
+
+
+def test_circuit_breaker_opens_and_probes(fake_transport, caplog):
+    calls = _script(fake_transport, [transport.TransportError("down")] * 3)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    spilled = []
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, circuit_breaker=breaker,
+                fallback=spilled.extend)
+
+    for i in range(5):
+        assert t._send({"i": i}) is False
+    assert len(calls) == 3
+    assert breaker.state == CircuitBreaker.OPEN
+    assert len(spilled) == 5
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert t._send({"i": "probe"}) is True
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert len(calls) == 4
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01, half_open_requests=1)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_failing_fallback_does_not_raise_from_track(caplog):
+    def fallback(batch):
+        raise RuntimeError("fallback broken")
+
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=transport.MemoryTransport(status=503),
+                fallback=fallback)
+    t.track(t.create_event().set_user_name("u").set_ip_address("1.1.1.1"))
+
+    assert t.stats()["events_failed"] == 1
+    assert any("fallback broken" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,97 @@
+import os
+from collections import Counter
+from urllib.parse import parse_qsl
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+routing = importlib.import_module(f"{PKG}.routing")
+
+Tracker = pkg.Tracker
+HashRing = routing.HashRing
+
+URLS = ["https://a/", "https://b/", "https://c/"]
+
+
+def _event(tracker, user):
+    event = tracker.create_event()
+    event.set_user_name(user).set_ip_address("1.1.1.1").set_url("/").set_http_method("GET")
+    return event
+
+
+def test_ring_is_stable_and_balanced():
+    ring = HashRing(URLS)
+    owners = Counter(ring.walk(f"user{i}")[0] for i in range(3000))
+
+    assert ring.walk("alice") == HashRing(URLS).walk("alice")
+    assert sorted(ring.walk("alice")) == URLS
+    assert all(600 < n < 1400 for n in owners.values())
+
+
+def test_adding_a_node_moves_few_keys():
+    before = HashRing(URLS)
+    after = HashRing(URLS + ["https://d/"])
+    moved = sum(before.walk(f"user{i}")[0] != after.walk(f"user{i}")[0] for i in range(3000))
+
+    assert moved < 1200
+
+
+def test_ring_rejects_empty_nodes():
+    with pytest.raises(ValueError):
+        HashRing([])
+
+
+def test_events_of_a_user_stay_on_one_node(fake_transport):
+    t = Tracker(api_url=URLS, api_key="k", transport=fake_transport)
+    for i in range(60):
+        t.track(_event(t, f"user{i % 20}"))
+    t.close()
+
+    urls = [(url, dict(parse_qsl(body.decode()))["userName"]) for url, body in fake_transport.sent]
+    owners = {}
+    for url, user in urls:
+        owners.setdefault(user, set()).add(url)
+    assert all(len(nodes) == 1 for nodes in owners.values())
+    assert len({url for url, _ in urls}) == 3
+
+
+def test_failover_to_next_node_on_the_ring(fake_transport):
+    urls = []
+    ring = HashRing(["https://a/sensor/", "https://b/sensor/", "https://c/sensor/"])
+    down = ring.walk("alice")[0]
+
+    def respond(url, body):
+        urls.append(url)
+        if url == down:
+            raise transport.TransportError("down")
+
+    fake_transport.respond = respond
+    t = Tracker(api_url=URLS, api_key="k", transport=fake_transport)
+    t.track(_event(t, "alice"))
+
+    assert urls == ring.walk("alice")[:2]
+    assert t.stats()["events_sent"] == 1
+    t.close()
+
+
+def test_unhealthy_node_is_skipped_when_routing(fake_transport):
+    t = Tracker(api_url=URLS, api_key="k", transport=fake_transport, async_mode=True,
+                circuit_breaker=pkg.CircuitBreaker(failure_threshold=1))
+    primary = t._candidates({"userName": "alice"})[0]
+    primary.breaker.record_failure()
+
+    assert t._route({"userName": "alice"}) is t._candidates({"userName": "alice"})[1]
+    assert t.stats()["healthy_endpoints"] == 2
+    t.close()
+
+
+def test_each_endpoint_has_its_own_pool_and_queue():
+    t = Tracker(api_url=URLS, api_key="k", async_mode=True)
+
+    assert len({id(endpoint.transport.session) for endpoint in t._endpoints}) == 3
+    assert len({id(endpoint.sender) for endpoint in t._endpoints}) == 3
+    assert len({id(endpoint.breaker) for endpoint in t._endpoints}) == 3
+    t.close()
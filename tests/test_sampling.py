@@ -0,0 +1,107 @@
+import os
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+sampling = importlib.import_module(f"{PKG}.sampling")
+
+Tracker = pkg.Tracker
+EventPolicy = pkg.EventPolicy
+
+
+def _event(tracker, user="alice", ip="1.1.1.1"):
+    return tracker.create_event().set_user_name(user).set_ip_address(ip).set_url("/").set_http_method("GET")
+
+
+def test_token_bucket_refills():
+    bucket = sampling.TokenBucket(rate=2, burst=2, now=0.0)
+
+    assert [bucket.take(0.0) for _ in range(3)] == [True, True, False]
+    assert bucket.take(0.5)
+    assert not bucket.take(0.5)
+
+
+def test_policy_validation():
+    with pytest.raises(ValueError):
+        EventPolicy(sample_rate=1.5)
+    with pytest.raises(ValueError):
+        EventPolicy(rate=0)
+
+
+def test_sampling_sheds_before_dump(fake_transport, monkeypatch):
+    dumped = []
+    monkeypatch.setattr(tr.Event, "dump", lambda self: dumped.append(self) or {})
+
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport,
+                policies={"page_view": EventPolicy(sample_rate=0.0)})
+    for _ in range(5):
+        t.track(_event(t))
+
+    assert dumped == []
+    assert fake_transport.sent == []
+    stats = t.stats()
+    assert stats["events_sampled_out"] == 5
+    assert stats["sampled_out"] == {"page_view": {"sampled": 5}}
+    assert stats["pending_events"] == 0
+
+
+def test_unlisted_types_are_never_dropped(fake_transport):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport,
+                policies={"page_view": EventPolicy(sample_rate=0.0)})
+    for _ in range(3):
+        t.track(_event(t).set_event_type_account_login_fail())
+
+    assert len(fake_transport.sent) == 3
+
+
+def test_default_policy_and_explicit_exemption(fake_transport):
+    policies = {"*": EventPolicy(sample_rate=0.0), "account_password_change": EventPolicy()}
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, policies=policies)
+    t.track(_event(t).set_event_type_page_search())
+    t.track(_event(t).set_event_type_account_password_change())
+
+    assert len(fake_transport.sent) == 1
+    assert t.stats()["sampled_out"] == {"page_search": {"sampled": 1}}
+
+
+def test_default_policy_skips_security_events(fake_transport):
+    policies = {"*": EventPolicy(sample_rate=0.0), "field_edit": EventPolicy(sample_rate=0.0)}
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, policies=policies)
+    t.track(_event(t).set_event_type_account_login_fail())
+    t.track(_event(t).set_event_type_account_password_change())
+    t.track(_event(t).set_event_type_field_edit())
+
+    assert len(fake_transport.sent) == 2
+    assert t.stats()["sampled_out"] == {"field_edit": {"sampled": 1}}
+
+
+def test_rate_and_per_user_limits(fake_transport):
+    policies = {"page_view": EventPolicy(rate=1000, burst=3, per_user_rate=0.001)}
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, policies=policies)
+    for user in ("a", "a", "b", "c", "d"):
+        t.track(_event(t, user=user))
+
+    assert len(fake_transport.sent) == 3
+    assert t.stats()["sampled_out"] == {"page_view": {"user_limited": 1, "rate_limited": 1}}
+
+
+def test_per_ip_keys_are_bounded():
+    policy = EventPolicy(per_ip_rate=0.001, max_keys=2)
+    for ip in ("1", "2", "3"):
+        assert policy.check(None, ip) is None
+
+    assert policy.check(None, "1") is None
+    assert policy.check(None, "3") == sampling.IP_LIMITED
+
+
+def test_track_many_reports_sampled_events(fake_transport):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, encoder="json",
+                policies={"page_view": EventPolicy(sample_rate=0.0)})
+    events = [_event(t), _event(t).set_event_type_account_login()]
+    results = []
+
+    assert t.track_many(events, on_result=lambda event, ok: results.append((event, ok))) == (1, 1)
+    assert results == [(events[0], False), (events[1], True)]
+    assert len(fake_transport.sent) == 1
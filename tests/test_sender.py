@@ -0,0 +1,191 @@
+import os
+import importlib
+import threading
+import time
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+sender = importlib.import_module(f"{PKG}.sender")
+
+Tracker = pkg.Tracker
+BatchSender = sender.BatchSender
+
+
+def test_async_track_does_not_wait_for_sensor(fake_transport, fill):
+    release = threading.Event()
+    fake_transport.respond = lambda url, body: release.wait(5) and None
+
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, async_mode=True,
+                flush_interval=0.01)
+    started = time.monotonic()
+    for _ in range(5):
+        t.track(fill(t.create_event()))
+    assert time.monotonic() - started < 1
+
+    release.set()
+    t.close(timeout=5)
+    assert len(fake_transport.sent) == 5
+
+
+def test_batches_by_size():
+    batches = []
+    s = BatchSender(batches.append, batch_size=3, flush_interval=60)
+    for i in range(7):
+        s.put({"i": i})
+    s.stop(timeout=5)
+
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert [d["i"] for b in batches for d in b] == list(range(7))
+
+
+def test_flushes_by_age():
+    batches = []
+    s = BatchSender(batches.append, batch_size=100, flush_interval=0.01)
+    s.put({"i": 1})
+    deadline = time.monotonic() + 5
+    while not batches and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert batches == [[{"i": 1}]]
+    s.stop(timeout=5)
+
+
+@pytest.mark.parametrize(
+    "policy, expected",
+    [
+        ("drop_newest", [0, 1]),
+        ("drop_oldest", [2, 3]),
+    ],
+)
+def test_overflow_policies(policy, expected):
+    gate = threading.Event()
+    batches = []
+
+    def send(batch):
+        gate.wait(5)
+        batches.append(batch)
+
+    s = BatchSender(send, queue_size=2, batch_size=1, flush_interval=60, overflow_policy=policy)
+    s.put({"i": "blocker"})
+    deadline = time.monotonic() + 5
+    while len(s) and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+    for i in range(4):
+        s.put({"i": i})
+    assert s.dropped == 2
+
+    gate.set()
+    s.stop(timeout=5)
+    assert [b[0]["i"] for b in batches[1:]] == expected
+
+
+def test_block_policy_waits_for_room():
+    gate = threading.Event()
+    s = BatchSender(lambda batch: gate.wait(5), queue_size=1, batch_size=1, flush_interval=60)
+    s.put({"i": 0})
+    s.put({"i": 1})
+
+    done = threading.Event()
+    threading.Thread(target=lambda: (s.put({"i": 2}), done.set()), daemon=True).start()
+    assert not done.wait(0.05)
+
+    gate.set()
+    assert done.wait(5)
+    s.stop(timeout=5)
+    assert s.dropped == 0
+
+
+def test_block_policy_drops_when_wait_expires():
+    gate = threading.Event()
+    dropped = []
+    s = BatchSender(lambda batch: gate.wait(5), queue_size=1, batch_size=1, flush_interval=60,
+                    block_timeout=0.05, on_drop=dropped.extend)
+    s.put({"i": 0})
+    deadline = time.monotonic() + 5
+    while len(s) and time.monotonic() < deadline:
+        time.sleep(0.005)
+    s.put({"i": 1})
+
+    started = time.monotonic()
+    assert not s.put({"i": 2})
+    assert 0.05 <= time.monotonic() - started < 5
+    assert dropped == [{"i": 2}]
+
+    gate.set()
+    s.stop(timeout=5)
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        BatchSender(lambda batch: None, overflow_policy="nope")
+
+
+def test_lanes_drain_by_weight():
+    s = BatchSender(lambda batch: None, batch_size=100, flush_interval=60, lanes=3)
+    for i in range(6):
+        s.put({"lane": 2}, 2)
+        s.put({"lane": 1}, 1)
+        s.put({"lane": 0}, 0)
+
+    with s._lock:
+        batch = s._drain(9)
+        s._size -= len(batch)
+    assert [d["lane"] for d in batch] == [0, 0, 0, 0, 1, 1, 2, 0, 0]
+    s.stop(timeout=5)
+
+
+def test_overflow_sheds_low_priority_first():
+    dropped = []
+    release = threading.Event()
+    s = BatchSender(lambda batch: release.wait(5), queue_size=3, batch_size=100, flush_interval=60,
+                    overflow_policy=sender.OVERFLOW_BLOCK, lanes=3, on_drop=dropped.extend)
+    s.put({"i": 1}, 2)
+    s.put({"i": 2}, 2)
+    s.put({"i": 3}, 1)
+
+    assert s.put({"i": 4}, 0)
+    assert s.put({"i": 5}, 1)
+    assert dropped == [{"i": 1}, {"i": 2}]
+    assert s.depths() == [1, 2, 0]
+
+    release.set()
+    s.stop(timeout=5)
+
+
+def test_drop_policies_never_shed_higher_lanes():
+    dropped = []
+    s = BatchSender(lambda batch: None, queue_size=2, batch_size=100, flush_interval=60,
+                    overflow_policy=sender.OVERFLOW_DROP_OLDEST, lanes=3, on_drop=dropped.extend)
+    s.put({"i": 1}, 0)
+    s.put({"i": 2}, 1)
+
+    assert not s.put({"i": 3}, 2)
+    assert s.put({"i": 4}, 1)
+    assert dropped == [{"i": 3}, {"i": 2}]
+    s.stop(timeout=5)
+
+
+def test_tracker_priority_lanes(fake_transport, fill):
+    release = threading.Event()
+    fake_transport.respond = lambda url, body: release.wait(5) and None
+
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, async_mode=True, queue_size=2,
+                flush_interval=60, overflow_policy=sender.OVERFLOW_DROP_NEWEST, priorities=pkg.DEFAULT_PRIORITIES)
+    t.track(fill(t.create_event()))
+    t.track(fill(t.create_event()).set_event_type_page_search())
+    t.track(fill(t.create_event()).set_event_type_account_login_fail())
+
+    stats = t.stats()
+    assert stats["lane_depths"] == [1, 1, 0]
+    assert stats["events_dropped"] == 1
+
+    release.set()
+    t.close(timeout=5)
+    assert len(fake_transport.sent) == 2
+
+
+def test_tracker_rejects_unknown_priority():
+    with pytest.raises(ValueError):
+        Tracker(api_url="https://localhost/", api_key="k", async_mode=True, priorities={"page_view": 7})
@@ -0,0 +1,96 @@
+import os
+import signal
+import threading
+import time
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+sender = importlib.import_module(f"{PKG}.sender")
+
+Tracker = pkg.Tracker
+BatchSender = sender.BatchSender
+
+
+def _event(tracker):
+    return tracker.create_event().set_user_name("alice").set_ip_address("1.1.1.1").set_url("/").set_http_method("GET")
+
+
+def test_sender_flush_sends_partial_batches():
+    batches = []
+    s = BatchSender(batches.append, batch_size=3, flush_interval=60)
+    for i in range(7):
+        s.put({"i": i})
+
+    assert s.flush(timeout=5)
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert s.taken == 7
+    s.stop(timeout=5)
+
+
+def test_flush_reports_sent_events(fake_transport):
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, async_mode=True, flush_interval=60)
+    for _ in range(5):
+        t.track(_event(t))
+
+    assert t.flush(timeout=5) == (5, 0)
+    assert len(fake_transport.sent) == 5
+    assert t.close() == (0, 0)
+    assert t.close() == (0, 0)
+
+
+def test_close_spills_what_misses_the_deadline(fake_transport):
+    release = threading.Event()
+    fake_transport.respond = lambda url, body: release.wait(5) and None
+
+    spilled = []
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, async_mode=True, batch_size=2,
+                flush_interval=60, fallback=spilled.extend)
+    for _ in range(6):
+        t.track(_event(t))
+
+    started = time.monotonic()
+    flushed, abandoned = t.close(timeout=0.2)
+    release.set()
+
+    # the one sender thread is stuck on its first batch, taken before or during close()
+    taken = t._endpoints[0].sender.taken
+    assert time.monotonic() - started < 2
+    assert taken == 2 and flushed <= taken
+    assert taken + abandoned == 6
+    assert len(spilled) == abandoned
+    assert t.stats()["events_abandoned"] == abandoned
+
+
+def test_sync_tracker_has_nothing_to_flush(fake_post):
+    t = Tracker(api_url="https://localhost/", api_key="k")
+    assert t.flush(timeout=1) == (0, 0)
+    t.close()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="requires SIGUSR1")
+def test_signal_hook_closes_and_chains(monkeypatch, fake_transport):
+    registered = []
+    monkeypatch.setattr(tr.atexit, "register", lambda *args: registered.append(args))
+
+    chained = []
+    previous = signal.signal(signal.SIGUSR1, lambda signum, frame: chained.append(signum))
+    try:
+        t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, async_mode=True,
+                    flush_interval=60)
+        t.install_shutdown_hooks(timeout=2, signals=(signal.SIGUSR1,))
+        t.track(_event(t))
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        deadline = time.monotonic() + 5
+        while not chained and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+
+    assert registered == [(t.close, 2)]
+    assert chained == [signal.SIGUSR1]
+    assert len(fake_transport.sent) == 1
+    assert t._closed.is_set()
@@ -0,0 +1,130 @@
+import os
+import time
+import importlib
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+
+Tracker = pkg.Tracker
+DiskSpool = pkg.DiskSpool
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_append_read_commit(tmp_path, use_mmap):
+    spool = DiskSpool(str(tmp_path), use_mmap=use_mmap)
+    spool.append([{"i": i} for i in range(5)])
+
+    records = spool.read(3)
+    assert [r for r, _ in records] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert spool.read(3) == records
+
+    spool.commit(records[-1][1])
+    assert [r for r, _ in spool.read(10)] == [{"i": 3}, {"i": 4}]
+    spool.close()
+
+
+def test_offsets_survive_reopen(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=32, max_bytes=1 << 20)
+    spool.append([{"i": i} for i in range(10)])
+    spool.commit(spool.read(4)[-1][1])
+    spool.close()
+
+    spool = DiskSpool(str(tmp_path), segment_bytes=32, max_bytes=1 << 20)
+    assert [r["i"] for r, _ in spool.read(100)] == list(range(4, 10))
+    spool.close()
+
+
+def test_rotation_and_cleanup(tmp_path):
+    spool = DiskSpool(str(tmp_path), segment_bytes=32, max_bytes=1 << 20)
+    for i in range(10):
+        spool.append([{"i": i}])
+    segments = [name for name in os.listdir(str(tmp_path)) if name.startswith("segment-")]
+    assert len(segments) > 2
+
+    spool.commit(spool.read(100)[-1][1])
+    assert len([name for name in os.listdir(str(tmp_path)) if name.startswith("segment-")]) == 1
+    assert spool.read(100) == []
+    spool.close()
+
+
+def test_size_cap_drops_oldest_segments(tmp_path, caplog):
+    spool = DiskSpool(str(tmp_path), segment_bytes=64, max_bytes=128)
+    for i in range(50):
+        spool.append([{"i": i}])
+
+    assert spool.size() <= 128 + 64
+    assert spool.dropped > 0
+    remaining = [r["i"] for r, _ in spool.read(100)]
+    assert remaining == list(range(50 - len(remaining), 50))
+    assert spool.dropped + len(remaining) == 50
+    spool.close()
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    spool.append([{"i": 0}])
+    spool.close()
+    path = os.path.join(str(tmp_path), sorted(n for n in os.listdir(str(tmp_path)) if n.startswith("segment-"))[-1])
+    with open(path, "ab") as f:
+        f.write(b'{"i": 1')
+
+    spool = DiskSpool(str(tmp_path))
+    spool.append([{"i": 2}])
+    assert [r["i"] for r, _ in spool.read(10)] == [0, 2]
+    spool.close()
+
+
+def test_tracker_spools_failures_and_replays(tmp_path, fake_transport, caplog):
+    def down(url, body):
+        raise transport.TransportError("sensor down")
+
+    fake_transport.respond = down
+    spool = DiskSpool(str(tmp_path))
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport, spool=spool, replay_interval=3600)
+    for i in range(3):
+        t.track(t.create_event().set_user_name(f"user-{i}"))
+    assert fake_transport.sent == []
+    assert t._replay(100) == 0
+
+    fake_transport.respond = None
+    assert t._replay(2) == 3
+    assert [d["userName"] for d in fake_transport.forms()] == ["user-0", "user-1", "user-2"]
+    assert spool.read(10) == []
+    t.close()
+
+
+def test_async_overflow_goes_to_spool(tmp_path, monkeypatch):
+    spool = DiskSpool(str(tmp_path))
+    sender = importlib.import_module(f"{PKG}.sender")
+    s = sender.BatchSender(lambda batch: None, queue_size=1, batch_size=10, flush_interval=60,
+                           overflow_policy="drop_newest", on_drop=spool.append)
+    s.put({"i": 0})
+    s.put({"i": 1})
+    s.stop(timeout=5)
+
+    assert [r for r, _ in spool.read(10)] == [{"i": 1}]
+    spool.close()
+
+
+def test_replay_thread_survives_errors(tmp_path, monkeypatch, caplog):
+    calls = []
+
+    def replay(batch_size):
+        calls.append(batch_size)
+        if len(calls) < 3:
+            raise FileNotFoundError("gone")
+        return 0
+
+    t = Tracker(api_url="https://localhost/", api_key="k", spool=DiskSpool(str(tmp_path)), replay_interval=0.01)
+    monkeypatch.setattr(t, "_replay", replay)
+
+    deadline = time.monotonic() + 5
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    t.close()
+
+    assert len(calls) >= 3
+    assert any("Replaying spooled events failed" in r.getMessage() for r in caplog.records)
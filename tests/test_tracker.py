@@ -1,4 +1,5 @@
 import os
+from urllib.parse import parse_qsl
 import importlib
 from datetime import datetime, timezone
 import pytest
@@ -6,23 +7,13 @@ import pytest
 PKG = os.getenv("PKG", "tirreno_tracker")
 pkg = importlib.import_module(PKG)
 tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
 
 Tracker = pkg.Tracker
 Event = pkg.Event
 
 
-def test_create_and_track_success(monkeypatch, recwarn):
-    calls = {}
-
-    def fake_post(*, url=None, data=None, headers=None, timeout=None, **kw):
-        calls.update(url=url, data=data, headers=headers, timeout=timeout, kw=kw)
-
-        class R:
-            status_code = 204
-        return R()
-
-    monkeypatch.setattr(tr.requests, "post", fake_post)
-
+def test_create_and_track_success(fake_post, caplog):
     t = Tracker(api_url="https://localhost/tirreno/sensor/", api_key="k", event_timeout=30)
     ev = t.create_event()
     ev.set_user_name("alice").set_ip_address("1.2.3.4").set_user_agent("UA") \
@@ -30,53 +21,101 @@ def test_create_and_track_success(monkeypatch, recwarn):
 
     t.track(ev)
 
-    assert calls["url"] == "https://localhost/tirreno/sensor/"
-    assert calls["headers"]["Api-Key"] == "k"
-    assert calls["timeout"] == 3
-    assert isinstance(calls["data"], dict)
+    assert fake_post["url"] == "https://localhost/tirreno/sensor/"
+    assert fake_post["headers"]["Api-Key"] == "k"
+    assert fake_post["timeout"] == 3
+    assert isinstance(fake_post["data"], bytes)
+    assert dict(parse_qsl(fake_post["data"].decode()))["userName"] == "alice"
+    assert fake_post["headers"]["Content-Type"] == "application/x-www-form-urlencoded"
 
     assert t.get_event(ev.get_uuid()) is None
 
 
-def test_track_missing_event_warns(recwarn):
+def test_track_missing_event_warns(caplog):
     t = Tracker(api_url="https://localhost/tirreno/sensor/", api_key="k")
     stray = Event("fake-uuid")
     t.track(stray)
-    assert any("Tracker misses Event object" in str(w.message) for w in recwarn.list)
-
-
-def test_outdated_cleanup_drop(monkeypatch, recwarn):
-    called = {"n": 0}
+    assert any("Tracker misses Event object" in r.getMessage() for r in caplog.records)
 
-    def fake_post(*, url=None, data=None, headers=None, timeout=None, **kw):
-        called["n"] += 1
 
-        class R:
-            status_code = 204
-        return R()
-
-    monkeypatch.setattr(tr.requests, "post", fake_post)
-
-    t1 = Tracker(api_url="https://localhost/tirreno/sensor/", api_key="k", event_timeout=1)
+def test_outdated_cleanup_drop(fake_transport, caplog):
+    t1 = Tracker(api_url="https://localhost/tirreno/sensor/", api_key="k", event_timeout=1, transport=fake_transport)
     old_ts = int(datetime.now(timezone.utc).timestamp()) - 999
     ev = t1.create_event()
-    t1._events[ev.get_uuid()]["ts"] = old_ts
+    t1._events[ev._uuid]["ts"] = old_ts
+    t1._expired_at = None
 
     t1.create_event()
 
-    assert any("dropping event" in str(w.message).lower() for w in recwarn.list)
-    assert called["n"] == 0
+    assert any("dropping event" in r.getMessage().lower() for r in caplog.records)
+    assert fake_transport.sent == []
 
 
-def test_http_exception_warns(monkeypatch, recwarn):
-    def boom(**kwargs):
-        raise tr.requests.RequestException("network down")
+def test_http_exception_warns(monkeypatch, caplog):
+    def boom(self, **kwargs):
+        raise transport.requests.RequestException("network down")
 
-    monkeypatch.setattr(tr.requests, "post", boom)
+    monkeypatch.setattr(transport.requests.Session, "post", boom)
 
     t = Tracker(api_url="https://localhost/tirreno/sensor/", api_key="k")
     ev = t.create_event()
     ev.set_user_name("alice").set_url("https://page/").set_http_method("GET")
 
     t.track(ev)
-    assert any("network down" in str(w.message).lower() for w in recwarn.list)
+    assert any("network down" in r.getMessage().lower() for r in caplog.records)
+
+
+def test_session_is_reused_and_pooled(monkeypatch, caplog):
+    sessions = []
+
+    def fake_post(self, *, url=None, data=None, headers=None, timeout=None, **kw):
+        sessions.append(self)
+
+    monkeypatch.setattr(transport.requests.Session, "post", fake_post)
+
+    t = Tracker(api_url="https://localhost/", api_key="k", pool_connections=2, pool_maxsize=7)
+    for _ in range(3):
+        t.track(t.create_event().set_user_name("alice"))
+
+    assert len(sessions) == 3 and all(s is sessions[0] for s in sessions)
+    adapter = sessions[0].get_adapter("https://localhost/sensor/")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 7
+
+
+def test_context_manager_closes_session(monkeypatch):
+    closed = []
+    monkeypatch.setattr(transport.requests.Session, "close", lambda self: closed.append(self))
+
+    with Tracker(api_url="https://localhost/", api_key="k") as t:
+        assert isinstance(t, Tracker)
+
+    assert closed == [t._endpoints[0].transport.session]
+
+
+def test_track_many_streams_generator_in_chunks(monkeypatch, fake_transport, caplog):
+    def respond(url, body):
+        if b"user-3" in body:
+            raise transport.TransportError("boom")
+
+    fake_transport.respond = respond
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=fake_transport)
+    chunks = []
+    original = t._send_many
+    monkeypatch.setattr(t, "_send_many", lambda batch: chunks.append(len(batch)) or original(batch))
+
+    def events():
+        for i in range(7):
+            yield t.create_event().set_user_name(f"user-{i}")
+        yield Event("stray")
+
+    results = []
+    sent_count, failed_count = t.track_many(events(), chunk_size=3, on_result=lambda ev, ok: results.append((ev.get_user_name(), ok)))
+
+    assert (sent_count, failed_count) == (6, 2)
+    assert chunks == [3, 3, 1]
+    sent = [d["userName"] for d in fake_transport.forms()]
+    assert sent == ["user-0", "user-1", "user-2", "user-4", "user-5", "user-6"]
+    assert results[3] == ("user-3", False)
+    assert (None, False) in results and len(results) == 8
+    assert len(t._events) == 0
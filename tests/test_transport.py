@@ -0,0 +1,110 @@
+import os
+import json
+import importlib
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl
+import pytest
+
+PKG = os.getenv("PKG", "tirreno_tracker")
+pkg = importlib.import_module(PKG)
+tr = importlib.import_module(f"{PKG}.tracking")
+transport = importlib.import_module(f"{PKG}.transport")
+
+Tracker = pkg.Tracker
+
+
+def test_memory_transport_records_every_endpoint(fill):
+    memory = transport.MemoryTransport()
+    t = Tracker(api_url=["https://a/", "https://b/", "https://c/"], api_key="k", transport=memory)
+    for i in range(20):
+        t.track(fill(t.create_event()).set_user_name(f"user-{i}"))
+
+    assert len(memory.sent) == 20
+    assert {url for url, body in memory.sent} == {"https://a/sensor/", "https://b/sensor/", "https://c/sensor/"}
+    assert dict(parse_qsl(memory.sent[0][1].decode()))["userName"] == "user-0"
+
+
+def test_memory_transport_status_is_retried(fill):
+    memory = transport.MemoryTransport(status=503)
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=memory,
+                retry=pkg.RetryPolicy(retries=2, backoff=0.001))
+
+    t.track(fill(t.create_event()))
+    assert t.stats()["events_failed"] == 1
+    assert len(memory.sent) == 3
+
+
+def test_file_transport_writes_ndjson(tmp_path, fill):
+    path = str(tmp_path / "events.ndjson")
+    t = Tracker(api_url="https://localhost/", api_key="k", transport=transport.FileTransport(path), encoder="gzip",
+                async_mode=True, flush_interval=60)
+    for _ in range(3):
+        t.track(fill(t.create_event()))
+    t.close(timeout=5)
+
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["url"] for line in lines] == ["https://localhost/sensor/"]
+    assert [data["userName"] for data in json.loads(lines[0]["body"])] == ["alice"] * 3
+
+
+def test_unknown_transport():
+    with pytest.raises(ValueError):
+        Tracker(api_url="https://localhost/", api_key="k", transport="nope")
+
+
+def test_urllib3_transport_posts_to_sensor(fill):
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(self.rfile.read(int(self.headers["Content-Length"])))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/sensor/"
+        with Tracker(api_url=url, api_key="k", transport="urllib3") as t:
+            t.track(fill(t.create_event()))
+            t.track(fill(t.create_event()))
+            assert t.stats()["events_sent"] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(received) == 2
+    assert dict(parse_qsl(received[0].decode()))["userName"] == "alice"
+
+    t = Tracker(api_url=url, api_key="k", transport="urllib3")
+    t.track(fill(t.create_event()))
+    assert t.stats()["events_failed"] == 1
+
+
+def test_custom_transport_only_needs_post(monkeypatch, fill):
+    class Recorder(transport.Transport):
+        def __init__(self):
+            self.urls = []
+
+        def post(self, url, body, headers, timeout):
+            self.urls.append(url)
+            return 204, {}
+
+    recorder = Recorder()
+    t = Tracker(api_url=["https://a/", "https://b/"], api_key="k", transport=recorder)
+    t.track(fill(t.create_event()))
+    assert len(recorder.urls) == 1
+
+    # a failing tracker does not stop the others from being reinitialized after fork
+    other = Tracker(api_url="https://localhost/", api_key="k", transport=recorder)
+    monkeypatch.setattr(tr, "trackers", tr.weakref.WeakSet([t, other]))
+    monkeypatch.setattr(t, "_after_fork", lambda: 1 / 0)
+    monkeypatch.setattr(other, "_pid", -1)
+    tr.reinit_after_fork()
+    assert other._pid == os.getpid()